@@ -1,61 +1,41 @@
-import re 
-import requests
 from typing import List, Dict, Optional
 from logger import setup_logging
-import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
-from app.config import ARXIV_BASE_URL, CATEGORIES
+from app.config import CATEGORIES
+from app.api.atom import iter_entries
 
 logger = setup_logging()
 
 def fetch_recent_papers(days_back: int = 1) -> List[Dict]:
     """
     Scraps selected categories of papers for the new day.
+
+    Every category + result page of the day is fetched, see harvester.harvest
     """
+    from app.api.harvester import harvest
+
     now = datetime.now()
 
-    start_date = (now- timedelta(days=days_back)).strftime('%Y%m%d')
+    day = (now - timedelta(days=days_back)).date()
 
     logger.info(f" Current Searchtime: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f" Searching for papers from date: {start_date}")
-    
-    search_query = f"({' OR '.join(f'cat:{cat}' for cat in CATEGORIES)}) AND submittedDate:[{start_date}0000 TO {start_date}2359]"
-    
-    params = {
-        'search_query': search_query,
-        'max_results': 100,
-        'sortBy': 'submittedDate',
-        'sortOrder': 'descending'
-    }
+    logger.info(f" Searching for papers from date: {day.strftime('%Y%m%d')}")
 
     try:
-        response = requests.get(ARXIV_BASE_URL, params=params)
-        return arxiv_format(response)
+        return [paper for batch in harvest(day, day) for paper in batch]
         
     except Exception as e:
         print(f"Error: {str(e)}")
         return []
 
-def arxiv_format(response: requests.Response) -> List[Dict]: 
-    root = ET.fromstring(response.content)
-    entries = root.findall('.//{http://www.w3.org/2005/Atom}entry')
-    
-    papers = []
-    for entry in entries:
-        categories = [cat.get('term') for cat in entry.findall('.//{http://www.w3.org/2005/Atom}category')]
-        
-        # Only include paper if all its categories are in CATEGORIES
-        if all(cat in CATEGORIES for cat in categories):
-            paper = {
-                'title': entry.find('.//{http://www.w3.org/2005/Atom}title').text.strip(),
-                'authors': [author.find('.//{http://www.w3.org/2005/Atom}name').text 
-                        for author in entry.findall('.//{http://www.w3.org/2005/Atom}author')],
-                'published': entry.find('.//{http://www.w3.org/2005/Atom}published').text,
-                'summary': re.sub(r'\n', ' ', entry.find('.//{http://www.w3.org/2005/Atom}summary').text.strip()),
-                'link': entry.find('.//{http://www.w3.org/2005/Atom}id').text,
-                'categories': categories
-            }
-            papers.append(paper)
+def in_categories(paper: Dict) -> bool:
+    """
+    Only include paper if all its categories are in CATEGORIES
+    """
+    return all(cat in CATEGORIES for cat in paper['categories'])
+
+def arxiv_format(content: bytes) -> List[Dict]: 
+    papers = [paper for paper in iter_entries(content) if in_categories(paper)]
 
     logger.info(f" {len(papers)} papers from direct match")
 
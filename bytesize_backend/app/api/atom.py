@@ -0,0 +1,92 @@
+"""Streaming parser for arXiv Atom feeds"""
+
+import io
+import re
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Dict, Iterator, Optional, Union
+
+NS = '{http://www.w3.org/2005/Atom}'
+ENTRY = NS + 'entry'
+TITLE = NS + 'title'
+AUTHOR = NS + 'author'
+NAME = NS + 'name'
+PUBLISHED = NS + 'published'
+SUMMARY = NS + 'summary'
+ID = NS + 'id'
+CATEGORY = NS + 'category'
+TOTAL_RESULTS = '{http://a9.com/-/spec/opensearch/1.1/}totalResults'
+
+# abs / pdf links, new (2502.12345) and old style (cs/0112017) ids, optional version + .pdf
+ARXIV_ID = re.compile(r'arxiv\.org/(?:abs|pdf)/(.+?)(v\d+)?(?:\.pdf)?$')
+
+def arxiv_id(link: Optional[str], keep_version: bool = False) -> Optional[str]:
+    """
+    http://arxiv.org/abs/2502.12345v2 / https://arxiv.org/pdf/2502.12345v2.pdf => 2502.12345 (2502.12345v2 with keep_version),
+    None for links that are not arXiv
+    """
+    if not link:
+        return None
+    match = ARXIV_ID.search(link.strip())
+    if not match:
+        return None
+    return match.group(1) + (match.group(2) or "") if keep_version else match.group(1)
+
+def _entry_record(entry: ET.Element) -> Dict:
+    """
+    One pass over the direct children of an <entry>, no descendant searches
+    """
+    paper = {'title': None, 'authors': [], 'published': None, 'summary': None, 'link': None, 'categories': []}
+    for child in entry:
+        tag = child.tag
+        if tag == AUTHOR:
+            name = child.find(NAME)
+            paper['authors'].append(name.text if name is not None else None)
+        elif tag == CATEGORY:
+            paper['categories'].append(child.get('term'))
+        elif tag == TITLE:
+            paper['title'] = (child.text or '').strip()
+        elif tag == PUBLISHED:
+            paper['published'] = child.text
+        elif tag == SUMMARY:
+            paper['summary'] = (child.text or '').strip().replace('\n', ' ')
+        elif tag == ID:
+            paper['link'] = child.text
+    return paper
+
+def iter_entries(source: Union[bytes, BinaryIO]) -> Iterator[Dict]:
+    """
+    Yields one paper dict per <entry> while the feed is read incrementally.
+
+    Each entry is cleared once converted and dropped from the root, so peak memory is one entry
+    rather than the whole tree no matter how many results were requested
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    root = None
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if root is None: # first start event => <feed>
+            root = elem
+            continue
+        if event == 'end' and elem.tag == ENTRY:
+            yield _entry_record(elem)
+            elem.clear()
+            root.remove(elem)
+
+def total_results(source: Union[bytes, BinaryIO]) -> Optional[int]:
+    """
+    opensearch:totalResults of a feed => how many entries the query matches across every page, None if missing.
+    It comes before the first <entry>, parsing stops there
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    for _, elem in ET.iterparse(source, events=('end',)):
+        if elem.tag == TOTAL_RESULTS:
+            try:
+                return int(elem.text)
+            except (TypeError, ValueError):
+                return None
+        if elem.tag == ENTRY:
+            break
+    return None
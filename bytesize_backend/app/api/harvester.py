@@ -0,0 +1,151 @@
+"""Paginated arXiv harvester, sharded per (category, day) with a resumable checkpoint
+
+Backfill CLI:
+    python -m app.api.harvester --start 2025-02-01 --end 2025-02-20
+    python -m app.api.harvester --start 2025-02-01 --end 2025-02-20 --categories cs.CL cs.LG --dry-run
+"""
+
+import os
+import json
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence
+from logger import setup_logging
+from app.config import CATEGORIES
+from app.api.atom import iter_entries, total_results
+from app.api.arxiv import in_categories
+from app.api.query_cache import query_arxiv
+
+logger = setup_logging()
+
+PAGE_SIZE = 500 # arXiv allows up to 2000 per request, smaller pages => finer grained checkpoints
+DEFAULT_CHECKPOINT = ".harvest_checkpoint.json"
+EMPTY_PAGE_RETRIES = 3 # arXiv sporadically answers a page with no entries before totalResults is reached
+
+def _shard_key(category: str, day: date) -> str:
+    return f"{day.isoformat()}|{category}"
+
+def load_checkpoint(path: Optional[str]) -> Dict:
+    """
+    {"done": [shard keys], "offsets": {shard key: next start}}
+    """
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"done": [], "offsets": {}}
+
+def save_checkpoint(path: Optional[str], checkpoint: Dict) -> None:
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path) # atomic => a crash never leaves half a checkpoint
+
+def harvest(
+        start: date, end: date, categories: Sequence[str] = CATEGORIES,
+        checkpoint_path: Optional[str] = None, page_size: int = PAGE_SIZE
+        ) -> Iterator[List[Dict]]:
+    """
+    Yields every paper submitted in [start, end] one result page at a time.
+
+    Each (category, day) shard is paged with `start` until the offset reaches the feed's totalResults
+    (a short page alone is not trusted, an empty one is retried), oldest first so offsets stay stable
+    while new papers arrive. A shard still coming back empty stays in the checkpoint for the next run.
+    Cross-listed papers are only yielded once.
+
+    The checkpoint is written after the consumer is done with a page (i.e. when the generator resumes),
+    so an interrupted run picks up at the first page that was not fully processed
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    done = set(checkpoint["done"])
+    seen = set()
+
+    day = start
+    while day <= end:
+        stamp = day.strftime('%Y%m%d')
+        for category in categories:
+            shard = _shard_key(category, day)
+            if shard in done:
+                continue
+
+            offset = checkpoint["offsets"].get(shard, 0)
+            empty_pages, complete = 0, True
+            while True:
+                params = {
+                    'search_query': f"cat:{category} AND submittedDate:[{stamp}0000 TO {stamp}2359]",
+                    'start': offset,
+                    'max_results': page_size,
+                    'sortBy': 'submittedDate',
+                    'sortOrder': 'ascending'
+                }
+                feed = query_arxiv(params, use_cache=False)
+                total = total_results(feed)
+                entries = list(iter_entries(feed))
+
+                if not entries:
+                    if total is not None and offset >= total:
+                        break
+                    empty_pages += 1
+                    if empty_pages > EMPTY_PAGE_RETRIES:
+                        logger.error(f" {shard} still empty at {offset}/{total} after {EMPTY_PAGE_RETRIES} retries, left for the next run")
+                        complete = False
+                        break
+                    logger.warning(f" {shard} empty page at {offset}/{total}, retrying ({empty_pages}/{EMPTY_PAGE_RETRIES})")
+                    continue
+                empty_pages = 0
+
+                batch = []
+                for paper in entries:
+                    if paper['link'] in seen or not in_categories(paper):
+                        continue
+                    seen.add(paper['link'])
+                    batch.append(paper)
+
+                logger.info(f" harvested {shard} [{offset}:{offset + len(entries)}] of {total} - {len(batch)} new")
+                if batch:
+                    yield batch
+
+                offset += len(entries)
+                if offset >= total if total is not None else len(entries) < page_size:
+                    break
+                checkpoint["offsets"][shard] = offset
+                save_checkpoint(checkpoint_path, checkpoint)
+
+            if not complete:
+                checkpoint["offsets"][shard] = offset
+                save_checkpoint(checkpoint_path, checkpoint)
+                continue
+
+            checkpoint["offsets"].pop(shard, None)
+            checkpoint["done"].append(shard)
+            done.add(shard)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+        day += timedelta(days=1)
+
+if __name__ == "__main__":
+    import asyncio
+    import argparse
+    from app.pipeline import run_pipeline
+
+    parser = argparse.ArgumentParser(description="Backfill papers submitted between --start and --end (inclusive)")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="YYYY-MM-DD, defaults to today")
+    parser.add_argument("--categories", nargs="+", default=CATEGORIES)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="resume file, removed once the range is complete")
+    parser.add_argument("--dry-run", action="store_true", help="only count papers, nothing is summarized or stored")
+    args = parser.parse_args()
+
+    total = 0
+    for batch in harvest(args.start, args.end, args.categories, checkpoint_path=args.checkpoint):
+        total += len(batch)
+        if not args.dry_run:
+            asyncio.run(run_pipeline(batch))
+
+    unfinished = load_checkpoint(args.checkpoint)["offsets"]
+    if unfinished: # shards that kept answering with empty pages => rerun the same command to resume them
+        logger.warning(f" backfill {args.start} => {args.end} incomplete - {total} papers, unfinished: {sorted(unfinished)}")
+    else:
+        logger.info(f" backfill {args.start} => {args.end} complete - {total} papers")
+        if os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
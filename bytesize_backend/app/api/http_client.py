@@ -0,0 +1,166 @@
+"""Shared pooled HTTP client => deadlines, jittered retries and a circuit breaker per upstream host"""
+
+import time
+import random
+import threading
+import requests
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from logger import setup_logging
+
+logger = setup_logging()
+
+CONNECT_TIMEOUT = 5 # seconds, per attempt
+DEFAULT_DEADLINE = 30 # seconds, total across every attempt of one call
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5 # seconds => full jitter in [0, base * 2^attempt]
+BACKOFF_CAP = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+BREAKER_THRESHOLD = 5 # consecutive failures before a host is cut off
+BREAKER_COOLDOWN = 30 # seconds before a single probe request is let through
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without touching the network while an upstream host is considered down"""
+
+class CircuitBreaker:
+    """
+    closed => requests flow, open => fail fast, half open (after cooldown) => one probe decides
+    """
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """
+        The call let through gave up before reaching the host => no verdict, the next caller probes instead
+        """
+        with self._lock:
+            self._probing = False
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            self._probing = False
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16) # keep-alive pool per host, sized for the pipeline workers
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def breaker_for(url: str) -> CircuitBreaker:
+    host = urlsplit(url).netloc
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+        return _breakers[host]
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """
+    Retry-After in seconds, either form (delta seconds / HTTP date)
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def request(
+        method: str, url: str, deadline: float = DEFAULT_DEADLINE, retries: int = MAX_RETRIES,
+        throttle: Optional[Callable[[], None]] = None, **kwargs
+        ) -> requests.Response:
+    """
+    requests.request over the shared session.
+
+    Every attempt gets a timeout capped by what is left of `deadline`. Connection errors, timeouts
+    and RETRY_STATUSES are retried with jittered backoff (Retry-After wins when given), as long as the
+    wait still fits in the deadline. The last response is returned as is => callers still raise_for_status.
+
+    throttle => called before every attempt, e.g. a rate limiter
+    """
+    breaker = breaker_for(url)
+    end = time.monotonic() + deadline
+
+    attempt = 0
+    while True:
+        # throttle / deadline can raise => both before allow(), which may hand this attempt the half open probe
+        if throttle is not None:
+            throttle()
+
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout(f"deadline of {deadline}s exceeded for {url}")
+
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit open for {urlsplit(url).netloc}")
+
+        response = None
+        try:
+            response = _session.request(method, url, timeout=(min(CONNECT_TIMEOUT, remaining), remaining), **kwargs)
+            failed = response.status_code in RETRY_STATUSES
+            error = None
+        except (requests.ConnectionError, requests.Timeout) as e:
+            failed = True
+            error = e
+        except requests.RequestException:
+            breaker.record(success=True) # bad request on our side, says nothing about the host
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        breaker.record(success=not failed or (response is not None and response.status_code == 429)) # 429 => host is up, just busy
+        if not failed:
+            return response
+
+        wait = retry_after(response) if response is not None else None
+        if wait is None:
+            wait = backoff(attempt)
+
+        attempt += 1
+        if attempt > retries or time.monotonic() + wait >= end:
+            if error is not None:
+                raise error
+            return response
+
+        logger.warning(f" retrying {method} {urlsplit(url).netloc} in {wait:.1f}s ({attempt}/{retries}) - {error or response.status_code}")
+        time.sleep(wait)
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
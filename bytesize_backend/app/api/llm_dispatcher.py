@@ -0,0 +1,211 @@
+"""Async LLM dispatcher => bounded in-flight chat completions that slow down on 429s / rate limit headers"""
+
+import re
+import time
+import asyncio
+import logging
+import httpx
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from logger import setup_logging
+from app.config import LLM_MAX_IN_FLIGHT
+from app.api.http_client import (
+    CircuitOpenError, breaker_for, retry_after, backoff,
+    CONNECT_TIMEOUT, MAX_RETRIES, RETRY_STATUSES
+)
+
+logger = setup_logging()
+logging.getLogger("httpx").setLevel(logging.WARNING) # one INFO line per request otherwise
+
+DURATION = re.compile(r'([\d.]+)(ms|s|m|h)')
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def _duration(value: str) -> Optional[float]:
+    """
+    "20ms" / "1s" / "6m0s" (OpenAI style) => seconds
+    """
+    parts = DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+def rate_limit_reset(headers: httpx.Headers) -> Optional[float]:
+    """
+    Seconds until the request quota refills when the provider says it is used up, else None
+
+    OpenAI: x-ratelimit-remaining-requests + x-ratelimit-reset-requests ("6m0s")
+    OpenRouter: X-RateLimit-Remaining + X-RateLimit-Reset (epoch ms)
+    """
+    remaining = headers.get("x-ratelimit-remaining-requests") or headers.get("x-ratelimit-remaining")
+    try:
+        if remaining is None or float(remaining) > 0:
+            return None
+    except ValueError:
+        return None
+
+    reset = headers.get("x-ratelimit-reset-requests") or headers.get("x-ratelimit-reset")
+    if not reset:
+        return None
+    try:
+        value = float(reset)
+    except ValueError:
+        return _duration(reset)
+    if value > 1e11: # epoch ms
+        return max(0.0, value / 1000 - time.time())
+    if value > 1e9: # epoch s
+        return max(0.0, value - time.time())
+    return value
+
+class LLMDispatcher:
+    """
+    Keeps at most `limit` requests in flight to one chat completions endpoint.
+
+    The limit starts at max_in_flight, is halved on every 429 and grows back by one after `limit`
+    successes in a row. A 429 / exhausted quota pauses every caller until Retry-After or the reset
+    time, callers queue (in arrival order) for a free slot instead of hammering the provider
+    """
+    def __init__(self, endpoint: str, headers: Dict, max_in_flight: int = LLM_MAX_IN_FLIGHT, retries: int = MAX_RETRIES):
+        self.endpoint = endpoint
+        self.headers = headers
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.limit = max_in_flight
+        self.in_flight = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._loop = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Condition] = None
+
+    async def _bind(self) -> None:
+        """
+        httpx / asyncio primitives belong to one event loop, scripts calling asyncio.run per paper get fresh ones
+
+        Callers running their own loop aclose() before it ends, a client left over from an earlier loop is closed here
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._client is not None:
+                try:
+                    await self._client.aclose()
+                except RuntimeError as e: # its loop is already closed => connections can't be shut down cleanly anymore
+                    logger.warning(f" LLM client of a finished event loop dropped without aclose(): {e}")
+            self._loop = loop
+            self._client = httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=self.max_in_flight, max_keepalive_connections=self.max_in_flight
+            ))
+            self._slots = asyncio.Condition()
+            self.in_flight = 0
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+    async def _acquire(self, end: float) -> None:
+        async with self._slots:
+            while True:
+                now = time.monotonic()
+                pause = self._paused_until - now
+                if pause <= 0 and self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                if end - now <= 0:
+                    raise httpx.TimeoutException(f"no free slot for {urlsplit(self.endpoint).netloc} before the deadline")
+                try: # woken by a released slot, or once the pause is over
+                    await asyncio.wait_for(self._slots.wait(), min(end - now, pause) if pause > 0 else end - now)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self) -> None:
+        async with self._slots:
+            self.in_flight -= 1
+            self._slots.notify_all()
+
+    def _pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _observe(self, response: httpx.Response, attempt: int) -> None:
+        if response.status_code == 429:
+            self.rate_limited += 1
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+            wait = retry_after(response)
+            if wait is None:
+                wait = rate_limit_reset(response.headers)
+            self._pause(wait if wait is not None else backoff(attempt))
+            logger.warning(f" LLM rate limited, {self.limit} in flight, paused {self._paused_until - time.monotonic():.1f}s")
+            return
+
+        reset = rate_limit_reset(response.headers)
+        if reset is not None: # quota used up => wait for the refill instead of collecting 429s
+            self._pause(reset)
+        if response.status_code < 400:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_in_flight:
+                self.limit += 1
+                self._successes = 0
+
+    async def complete(self, data: Dict, deadline: float) -> Dict:
+        """
+        POSTs one chat completion request and returns the decoded body.
+
+        429s wait out the shared pause, connection errors / 5xx are retried with jittered backoff,
+        all within `deadline` seconds including the time spent queued for a slot
+        """
+        await self._bind()
+        breaker = breaker_for(self.endpoint)
+        end = time.monotonic() + deadline
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"circuit open for {urlsplit(self.endpoint).netloc}")
+
+            response, error = None, None
+            try:
+                await self._acquire(end)
+                try:
+                    remaining = max(0.1, end - time.monotonic())
+                    response = await self._client.post(
+                        self.endpoint, headers=self.headers, json=data,
+                        timeout=httpx.Timeout(remaining, connect=min(CONNECT_TIMEOUT, remaining))
+                    )
+                except httpx.TransportError as e:
+                    error = e
+                finally:
+                    await self._release()
+            except BaseException: # no slot before the deadline / cancelled => no verdict on the host, frees a half open probe
+                breaker.release()
+                raise
+
+            failed = response is None or response.status_code in RETRY_STATUSES
+            breaker.record(success=not failed or response.status_code == 429) # 429 => host is up, just busy
+            if response is not None:
+                self._observe(response, attempt)
+            if not failed:
+                if response.is_error: # 4xx other than 429 => retrying won't help
+                    self.failed += 1
+                    response.raise_for_status()
+                self.completed += 1
+                return response.json()
+
+            if response is not None and response.status_code == 429:
+                wait = self._paused_until - time.monotonic() # waited out in _acquire
+            else:
+                wait = (retry_after(response) if response is not None else None) or backoff(attempt)
+
+            attempt += 1
+            if attempt > self.retries or time.monotonic() + wait >= end:
+                self.failed += 1
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+
+            if response is None or response.status_code != 429:
+                logger.warning(f" retrying LLM call in {wait:.1f}s ({attempt}/{self.retries}) - {error or response.status_code}")
+                await asyncio.sleep(wait)
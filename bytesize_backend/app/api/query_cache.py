@@ -0,0 +1,208 @@
+"""Cached, coalesced and rate limited access to the arXiv query API"""
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from logger import setup_logging
+from app.api import http_client
+from app.config import (
+    ARXIV_BASE_URL, ARXIV_MIN_INTERVAL, ARXIV_CACHE_TTL,
+    ARXIV_CACHE_SIZE, ARXIV_CACHE_PATH, ARXIV_CACHE_DISK_SIZE
+)
+
+logger = setup_logging()
+
+class RateLimited(Exception):
+    """
+    No rate limiter slot within the caller's max_wait
+    """
+
+class RateLimiter:
+    """
+    Spaces calls at least `interval` seconds apart across every thread of the process
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, max_wait: Optional[float] = None) -> bool:
+        """
+        Sleeps until the caller's slot, max_wait => only books a slot that is at most max_wait away,
+        returns False (nothing booked, no sleep) otherwise
+        """
+        with self._lock: # reserve a slot, sleep outside the lock
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            if max_wait is not None and slot - now > max_wait:
+                return False
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return True
+
+PRUNE_EVERY = 64 # disk writes between sweeps of expired / surplus rows
+
+class TTLCache:
+    """
+    LRU of bytes values with a per entry expiry, backed by an optional sqlite file so entries survive restarts
+
+    The file keeps at most disk_maxsize rows: expired rows and the oldest written beyond the cap are
+    deleted at startup and every PRUNE_EVERY writes
+    """
+    def __init__(self, maxsize: int, ttl: float, path: Optional[str] = None, disk_maxsize: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_maxsize = disk_maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple] = OrderedDict() # key => (expires_at, value)
+        self._lock = threading.Lock()
+        self._disk = None
+        self._writes = 0
+
+        if path:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires_at REAL, value BLOB)")
+            self._disk.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+            self._prune()
+            self._disk.commit()
+
+    def _prune(self) -> None:
+        """
+        Same ttl for every entry => the lowest expires_at are the oldest writes
+        """
+        self._disk.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+        if self.disk_maxsize is not None:
+            self._disk.execute("""
+                DELETE FROM cache WHERE key IN (
+                    SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.disk_maxsize,))
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT expires_at, value FROM cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._store(key, row[0], row[1]) # promote to memory
+                    self.hits += 1
+                    return row[1]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, expires_at, value)
+            if self._disk is not None:
+                self._disk.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (key, expires_at, value))
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune()
+                self._disk.commit()
+
+    def _store(self, key: str, expires_at: float, value: bytes) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution of fn
+    """
+    def __init__(self):
+        self._calls: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "value": None, "error": None}
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["value"]
+
+        try:
+            call["value"] = fn()
+            return call["value"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+arxiv_limiter = RateLimiter(ARXIV_MIN_INTERVAL)
+arxiv_cache = TTLCache(ARXIV_CACHE_SIZE, ARXIV_CACHE_TTL, ARXIV_CACHE_PATH, ARXIV_CACHE_DISK_SIZE)
+_inflight = SingleFlight()
+
+def cache_key(params: Dict) -> str:
+    """
+    Normalized query params => arXiv search is case insensitive and ignores extra whitespace
+    """
+    normalized = {}
+    for name, value in params.items():
+        value = str(value)
+        if name == 'search_query':
+            value = re.sub(r'\s+', ' ', value.strip().lower())
+        normalized[name] = value
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+def _fetch(params: Dict, max_wait: Optional[float] = None, deadline: Optional[float] = None) -> bytes:
+    def throttle() -> None: # retries are rate limited too
+        if not arxiv_limiter.wait(max_wait):
+            raise RateLimited(f"no arXiv slot within {max_wait:.1f}s")
+
+    kwargs = {"deadline": deadline} if deadline is not None else {}
+    response = http_client.get(ARXIV_BASE_URL, params=params, throttle=throttle, **kwargs)
+    response.raise_for_status()
+    return response.content
+
+def query_arxiv(params: Dict, use_cache: bool = True, max_wait: Optional[float] = None, deadline: Optional[float] = None) -> bytes:
+    """
+    Returns the raw Atom feed for an arXiv API query
+
+    Every call goes through the shared rate limiter. With use_cache, repeated queries are served
+    from the TTL cache and identical in-flight queries wait for the first one instead of hitting arXiv
+
+    max_wait => raises RateLimited instead of queueing longer than that for a limiter slot (interactive
+    callers), None waits as long as it takes (harvester). deadline => caps the http request as well
+    """
+    if not use_cache:
+        return _fetch(params, max_wait, deadline)
+
+    key = cache_key(params)
+    content = arxiv_cache.get(key)
+    if content is not None:
+        return content
+
+    def load() -> bytes:
+        content = _fetch(params, max_wait, deadline)
+        arxiv_cache.set(key, content)
+        return content
+
+    return _inflight.do(key, load)
@@ -1,14 +1,21 @@
-import re
-import requests
-from typing import List, Dict
+from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 from logger import setup_logging
-import xml.etree.ElementTree as ET
-from app.config import ARXIV_BASE_URL
+from app.config import ARXIV_SEARCH_MAX_WAIT, SEARCH_ARXIV_WORKERS
+from app.api.query_cache import query_arxiv
 from app.api.arxiv import arxiv_format
+from app.api.atom import iter_entries
+from app.search_index import trigram_score
 
 logger = setup_logging()
 
-def search_papers(query: str, search_type: str, max_results: int = 5) -> List[Dict]:
+# /api/search runs its blocking arXiv calls here => abandoned calls can't pile up in the loop's default executor
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_ARXIV_WORKERS, thread_name_prefix="arxiv-search")
+
+def search_papers(
+        query: str, search_type: str, max_results: int = 5,
+        max_wait: Optional[float] = ARXIV_SEARCH_MAX_WAIT, deadline: Optional[float] = None
+        ) -> List[Dict]:
     """
     Search for papers on arXiv based on query string.
     
@@ -16,6 +23,8 @@ def search_papers(query: str, search_type: str, max_results: int = 5) -> List[Di
         query: Search query 
         search_type: type of search ('author', 'title')
         max_results: number of results to return
+        max_wait: longest wait for an arXiv rate limiter slot, raises RateLimited beyond it
+        deadline: seconds for the whole http request
         
     Returns:
         List of paper dictionaries with metadata
@@ -36,10 +45,12 @@ def search_papers(query: str, search_type: str, max_results: int = 5) -> List[Di
         'sortOrder': 'descending'
     }
     
-    response = requests.get(ARXIV_BASE_URL, params=params)
-    return arxiv_format(response)
+    return arxiv_format(query_arxiv(params, max_wait=max_wait, deadline=deadline))
 
-def fuzzy_match_papers(query: str, max_results: int = 10) -> List[Dict] | None:
+def fuzzy_match_papers(
+        query: str, max_results: int = 10,
+        max_wait: Optional[float] = ARXIV_SEARCH_MAX_WAIT, deadline: Optional[float] = None
+        ) -> List[Dict] | None:
     """
     Perform a fuzzy search for papers to handle partial matches.
     
@@ -62,38 +73,11 @@ def fuzzy_match_papers(query: str, max_results: int = 10) -> List[Dict] | None:
         'sortOrder': 'descending'
     }
     
-    response = requests.get(ARXIV_BASE_URL, params=params)
-    response.raise_for_status()
-    
-    root = ET.fromstring(response.content)
-    entries = root.findall('.//{http://www.w3.org/2005/Atom}entry')
-    
     # rank results
     results = []
-    for entry in entries:
-        title = entry.find('.//{http://www.w3.org/2005/Atom}title').text.strip()
-        title_lower = title.lower()
-        
-        # for each title, +1 score for each term that appears in title 
-        score = sum(1 for term in terms if term in title_lower)
-        
-        # for matching, users typically type in terms in order "attention is all" ==> attention is all you need => Should rank such papers higher 
-        # more score if the terms are in order 
-        if ' '.join(terms) in title_lower:
-            score += 3
-            
-        # create dict for further reranking later 
-        paper = {
-            'title': title,
-            'authors': [author.find('.//{http://www.w3.org/2005/Atom}name').text 
-                    for author in entry.findall('.//{http://www.w3.org/2005/Atom}author')],
-            'published': entry.find('.//{http://www.w3.org/2005/Atom}published').text,
-            'summary': re.sub(r'\n', ' ', entry.find('.//{http://www.w3.org/2005/Atom}summary').text.strip()),
-            'link': entry.find('.//{http://www.w3.org/2005/Atom}id').text,
-            'categories': [cat.get('term') for cat in entry.findall('.//{http://www.w3.org/2005/Atom}category')],
-            'relevance_score': score
-        }
-        
+    for paper in iter_entries(query_arxiv(params, max_wait=max_wait, deadline=deadline)):
+        # share of query trigrams present in the title => handles partial words / typos and favours tighter titles
+        paper['relevance_score'] = trigram_score(query, paper['title'])
         results.append(paper)
     
     # sort by relevance score + take max 
@@ -1,10 +1,14 @@
 import re
-import requests
 from typing import List, Dict
 from datetime import datetime
 from app.database.paper import Paper
-from app.config import ARXIV_BASE_URL
+from app.api import http_client
+from app.api.atom import iter_entries
+from app.api.query_cache import query_arxiv
+from app.snapshot import refresh_feeds
+from app.search_index import index_paper, unindex_paper
 from app.database.connection import get_db
+from app.database.crud import create_papers
 from app.config import SEMANTIC_SCHOLAR_URL
 
 def append_default_time(date_str: str) -> str:
@@ -23,7 +27,7 @@ def fetch_popular_papers(min_citations: int = 10000) -> List[Dict]:
         "year": "2015-"
     }
 
-    response = requests.get(SEMANTIC_SCHOLAR_URL, params=params)
+    response = http_client.get(SEMANTIC_SCHOLAR_URL, params=params, deadline=60) # 1000 rows
     response.raise_for_status()
     
     data = response.json()
@@ -45,6 +49,17 @@ def fetch_popular_papers(min_citations: int = 10000) -> List[Dict]:
 
     return papers[:1000]
 
+def import_popular_papers(min_citations: int = 10000) -> int:
+    """
+    Stores the popular papers in one batched insert, returns how many were new
+    """
+    papers = fetch_popular_papers(min_citations)
+    with next(get_db()) as db:
+        inserted = create_papers(db, papers)
+
+    if inserted:
+        refresh_feeds()
+    return len(inserted)
 
 def clean_title(title: str) -> str:
     """
@@ -67,31 +82,13 @@ def search_arxiv_by_title(title: str) -> dict:
             'sortOrder': 'descending'
         }
         
-        response = requests.get(ARXIV_BASE_URL, params=params)
-        response.raise_for_status()
-        
-        import xml.etree.ElementTree as ET
-        root = ET.fromstring(response.content)
-        
-        entry = root.find('.//{http://www.w3.org/2005/Atom}entry')
-        if entry is None:
+        data = next(iter_entries(query_arxiv(params)), None)
+        if data is None:
             return None
-            
-        arxiv_title = entry.find('.//{http://www.w3.org/2005/Atom}title').text.strip()
         
         # check title similarity 
-        if not titles_match(title, arxiv_title):
+        if not titles_match(title, data['title']):
             return None
-            
-        data = {
-            'title': arxiv_title,
-            'authors': [author.find('.//{http://www.w3.org/2005/Atom}name').text 
-                       for author in entry.findall('.//{http://www.w3.org/2005/Atom}author')],
-            'published': entry.find('.//{http://www.w3.org/2005/Atom}published').text,
-            'summary': re.sub(r'\n', ' ', entry.find('.//{http://www.w3.org/2005/Atom}summary').text.strip()),
-            'link': entry.find('.//{http://www.w3.org/2005/Atom}id').text,
-            'categories': [cat.get('term') for cat in entry.findall('.//{http://www.w3.org/2005/Atom}category')]
-        }
         
         return data
         
@@ -116,6 +113,7 @@ def update_semantic_scholar_papers():
     Update Semantic Scholar papers with data from arXiv while preserving citation counts.
     """
     with next(get_db()) as db:
+        db.expire_on_commit = False # a commit per paper would otherwise reload every remaining paper row by row
 
         semantic_papers = db.query(Paper).filter(Paper.citations != 0).all()
         
@@ -124,6 +122,7 @@ def update_semantic_scholar_papers():
             arxiv_data = search_arxiv_by_title(paper.title)
             
             original_citations = paper.citations
+            unindex_paper(paper.title)
             
             paper.title = arxiv_data['title']
             paper.authors = arxiv_data['authors']
@@ -135,8 +134,11 @@ def update_semantic_scholar_papers():
             paper.citations = original_citations
                 
             db.commit()
+            index_paper(arxiv_data['title'], arxiv_data['authors'])
+
+    refresh_feeds()
 
 
 if __name__ == "__main__":
-    data = fetch_popular_papers()
+    import_popular_papers()
     update_semantic_scholar_papers()
\ No newline at end of file
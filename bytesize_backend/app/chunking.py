@@ -0,0 +1,118 @@
+"""Token counting and section aware chunking of extracted paper text"""
+
+import re
+import math
+from dataclasses import dataclass
+from typing import List, Sequence
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base") # gpt-3.5 / gpt-4 tokenizer
+except Exception: # not installed / no cached vocab => estimate
+    _encoding = None
+
+CHARS_PER_TOKEN = 4 # rough average for English prose, only used without tiktoken
+
+# a line that is only a section heading e.g. "Abstract", "3 Method", "4.2 Ablations", "II. RELATED WORK"
+SECTION_HEADING = re.compile(
+    r'^[ \t]*(?:'
+    r'(?:\d+(?:\.\d+)*|[IVX]+)\.?[ \t]+[A-Z][A-Za-z \-:,&/]{2,60}'
+    r'|(?i:abstract|introduction|related work|background|methods?|methodology|approach|experiments?|evaluation|results|discussion|conclusions?|limitations)'
+    r')[ \t]*$',
+    re.MULTILINE
+)
+
+# sections a summary can least afford to lose when the budget does not cover the whole paper
+KEY_SECTIONS = re.compile(r'(?i)abstract|introduction|method|approach|result|conclusion')
+
+@dataclass
+class Chunk:
+    heading: str # first section heading in the chunk, "" for text before any heading
+    text: str
+    tokens: int
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def split_sections(text: str) -> List[tuple]:
+    """
+    Text => [(heading, section text)], the text before the first heading (title, abstract) comes first
+    """
+    sections = []
+    heading, start = "", 0
+    for match in SECTION_HEADING.finditer(text):
+        if text[start:match.start()].strip():
+            sections.append((heading, text[start:match.start()].strip()))
+        heading, start = match.group().strip(), match.start()
+    if text[start:].strip():
+        sections.append((heading, text[start:].strip()))
+    return sections
+
+def _split_oversized(text: str, max_tokens: int) -> List[str]:
+    """
+    A section larger than a chunk => paragraphs, and paragraphs larger than a chunk => whitespace cut windows
+    """
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        if count_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        words = paragraph.split()
+        window = []
+        for word in words:
+            window.append(word)
+            if len(window) % 64 == 0 and count_tokens(" ".join(window)) > max_tokens:
+                overflow = window[-64:]
+                pieces.append(" ".join(window[:-64]))
+                window = overflow
+        if window:
+            pieces.append(" ".join(window))
+    return [piece for piece in pieces if piece.strip()]
+
+def chunk_text(text: str, max_tokens: int) -> List[Chunk]:
+    """
+    Packs consecutive sections into chunks of at most ~max_tokens, a chunk only ends on a section
+    boundary unless a single section is too large on its own
+    """
+    chunks = []
+    heading, parts, tokens = None, [], 0
+
+    def flush():
+        if parts:
+            chunks.append(Chunk(heading or "", "\n\n".join(parts), tokens))
+
+    for section_heading, section in split_sections(text):
+        section_tokens = count_tokens(section)
+        pieces = [section] if section_tokens <= max_tokens else _split_oversized(section, max_tokens)
+        for piece in pieces:
+            piece_tokens = section_tokens if len(pieces) == 1 else count_tokens(piece)
+            if parts and tokens + piece_tokens > max_tokens:
+                flush()
+                heading, parts, tokens = None, [], 0
+            if heading is None:
+                heading = section_heading
+            parts.append(piece)
+            tokens += piece_tokens
+    flush()
+    return chunks
+
+def select_chunks(chunks: Sequence[Chunk], budget: int, overhead: int) -> List[Chunk]:
+    """
+    Keeps the chunks whose tokens + per call overhead fit in budget: the opening chunk and key sections
+    (abstract, intro, method, results, conclusion) first, then the rest in document order.
+    Returned in document order
+    """
+    order = sorted(
+        range(len(chunks)),
+        key=lambda i: (i != 0 and not KEY_SECTIONS.search(chunks[i].heading), i)
+    )
+    kept, spent = [], 0
+    for i in order:
+        cost = chunks[i].tokens + overhead
+        if spent + cost > budget:
+            continue
+        kept.append(i)
+        spent += cost
+    return [chunks[i] for i in sorted(kept)]
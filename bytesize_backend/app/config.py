@@ -5,11 +5,55 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("SUPABASE_DATABASE_URL")
 
+# connections per process => the pooler's limit split across uvicorn workers, minus the sync ingest pool
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 20))
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", 5)) # pipeline / scheduler / scripts
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", max(2, DB_MAX_CONNECTIONS // WEB_CONCURRENCY - DB_SYNC_POOL_SIZE))) # async api pool
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10)) # seconds a request waits for a free connection
+
+# SQL logging => echo every statement only when asked for, otherwise log a sample of the slow ones
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 250)) # negative => slow query log off
+SLOW_QUERY_SAMPLE = float(os.getenv("SLOW_QUERY_SAMPLE", 1.0)) # share of slow statements that are logged
+
+EXPORT_BATCH = int(os.getenv("EXPORT_BATCH", 1000)) # rows per server side cursor fetch of /api/export
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", max(1, DB_POOL_SIZE // 4))) # /api/export streams per process, each holds an api pool connection
+SEARCH_DEADLINE = float(os.getenv("SEARCH_DEADLINE", 4.0)) # seconds, /api/search answers with whatever sources made it
+SEARCH_ARXIV_HEAD_START = float(os.getenv("SEARCH_ARXIV_HEAD_START", 0.5)) # seconds the local search runs alone before arXiv is asked too
+SEARCH_ARXIV_WORKERS = int(os.getenv("SEARCH_ARXIV_WORKERS", 2)) # threads for arXiv calls of /api/search, the limiter allows one per 3s anyway
+
 ARXIV_BASE_URL = 'http://export.arxiv.org/api/query?'
 CATEGORIES = ['cs.AI', 'cs.CL', 'cs.CV', 'cs.LG', 'cs.MA', 'cs.NE']
 
 SEMANTIC_SCHOLAR_URL = 'http://api.semanticscholar.org/graph/v1/paper/search/bulk'
 
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", 60)) # uncited papers older than this are deleted daily
+
+# arXiv query cache + rate limit (arXiv asks for at most 1 request every 3 seconds)
+ARXIV_MIN_INTERVAL = float(os.getenv("ARXIV_MIN_INTERVAL", 3.0))
+ARXIV_SEARCH_MAX_WAIT = float(os.getenv("ARXIV_SEARCH_MAX_WAIT", ARXIV_MIN_INTERVAL)) # user searches give up on a busier limiter, the harvester waits
+ARXIV_CACHE_TTL = int(os.getenv("ARXIV_CACHE_TTL", 6 * 60 * 60)) # seconds
+ARXIV_CACHE_SIZE = int(os.getenv("ARXIV_CACHE_SIZE", 512)) # in-memory entries
+ARXIV_CACHE_PATH = os.getenv("ARXIV_CACHE_PATH") # sqlite file for the on-disk tier, unset => memory only
+ARXIV_CACHE_DISK_SIZE = int(os.getenv("ARXIV_CACHE_DISK_SIZE", 20000)) # on-disk rows, oldest written are evicted beyond it
+
+# extracted pdf text cache, keyed by arXiv id + version
+TEXT_CACHE_DIR = os.getenv("TEXT_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".text_cache"))
+TEXT_CACHE_MAX_BYTES = int(os.getenv("TEXT_CACHE_MAX_MB", 512)) * 1024 * 1024
+
+# LLM summary cache, keyed by (normalized paper text, system prompt, model)
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".summary_cache.sqlite"))
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", 90 * 24 * 60 * 60)) # seconds
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", 256)) # in-memory entries
+SUMMARY_CACHE_DISK_SIZE = int(os.getenv("SUMMARY_CACHE_DISK_SIZE", 100000)) # on-disk rows
+
+# LLM spend / latency per paper, longer papers are map-reduced over section aware chunks
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", 16000)) # prompt + completion tokens across all calls
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", 3000))
+SUMMARY_DEADLINE = float(os.getenv("SUMMARY_DEADLINE", 180)) # seconds per paper
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", 8)) # concurrent LLM requests per process, halved on every 429
+
 
 # cs.AI = Artificial Intelligence
 # cs.CL = Computation and Language
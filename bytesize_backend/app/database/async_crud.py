@@ -0,0 +1,56 @@
+"""Async readers for the API handlers, same statements as crud.py executed on an AsyncSession"""
+
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import EXPORT_BATCH
+from app.database.paper import Paper
+from app.database.crud import (
+    PAPER_FIELDS, FEED_FIELDS, papers_page_statement, papers_page, paper_statement, title_search_statements,
+    titles_statement, in_title_order, author_search_statement, export_statement
+)
+
+async def get_papers_page(
+        db: AsyncSession, limit: int, cursor: Optional[str] = None, 
+        days: int = 30, cite: bool = False, fields: Sequence[str] = FEED_FIELDS
+        ) -> Tuple[List[Paper], Optional[str]]:
+    """
+    See crud.get_papers_page
+    """
+    statement = papers_page_statement(limit, cursor, days, cite, fields)
+    return papers_page((await db.scalars(statement)).all(), limit, cite)
+
+async def get_paper(db: AsyncSession, paper_id: int) -> Paper | None:
+    return (await db.scalars(paper_statement(paper_id))).first()
+
+async def search_titles(db: AsyncSession, query: str, limit: int, fields: Sequence[str] = FEED_FIELDS) -> List[Paper]:
+    """
+    See crud.search_titles
+    """
+    full_text, fallback = title_search_statements(query, limit, fields)
+    if full_text is not None:
+        papers = (await db.scalars(full_text)).all()
+        if papers:
+            return list(papers)
+    return list((await db.scalars(fallback)).all())
+
+async def get_papers_by_titles(db: AsyncSession, titles: List[str], fields: Sequence[str] = FEED_FIELDS) -> List[Paper]:
+    if not titles:
+        return []
+    return in_title_order((await db.scalars(titles_statement(titles, fields))).all(), titles)
+
+async def search_authors(db: AsyncSession, query: str, limit: int, fields: Sequence[str] = FEED_FIELDS) -> List[Paper]:
+    return list((await db.scalars(author_search_statement(query, limit, fields))).all())
+
+async def export_batches(
+        db: AsyncSession, fields: Sequence[str] = PAPER_FIELDS, after_id: Optional[int] = None,
+        since: Optional[datetime] = None, batch_size: int = EXPORT_BATCH
+        ) -> AsyncIterator[Sequence[Row]]:
+    """
+    Streams crud.export_statement through a server side cursor, batch_size rows at a time
+    """
+    statement = export_statement(fields, after_id, since).execution_options(yield_per=batch_size)
+    result = await db.stream(statement)
+    async for batch in result.partitions():
+        yield batch
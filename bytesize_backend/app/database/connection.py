@@ -1,10 +1,16 @@
 """Database connection configuration with connection pooler setup."""
 
-from typing import Generator
+import os
+from uuid import uuid4
+from typing import AsyncGenerator, Generator
 from dotenv import load_dotenv
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.database import query_log
 from app.database.init_db import init_dev_db
+from app.config import DB_ECHO, DB_POOL_SIZE, DB_POOL_TIMEOUT
 
 load_dotenv(override=True)
 
@@ -16,6 +22,48 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+TRANSACTION_POOLER_PORT = 6543 # Supabase pgbouncer in transaction mode
+
+def async_database_url(database_url: str) -> URL:
+    """
+    postgresql:// (psycopg2) url => postgresql+asyncpg://, libpq's sslmode is spelled ssl for asyncpg
+    """
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    query = dict(url.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(query=query)
+
+def _async_connect_args(url: URL) -> dict:
+    if url.port == TRANSACTION_POOLER_PORT: # statements can land on another backend => no prepared statement cache
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            # SQLAlchemy prepares every statement, asyncpg's default __asyncpg_stmt_N__ names of two clients collide on a shared backend
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {}
+
+_async_url = async_database_url(os.getenv("SUPABASE_DATABASE_URL"))
+
+# API handlers => queries never block the event loop, concurrency bounded by the pool instead of the loop
+async_engine = create_async_engine(
+    _async_url,
+    echo=DB_ECHO,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=0,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    connect_args=_async_connect_args(_async_url)
+)
+query_log.install(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False # objects are serialized after the session closes
+)
+
 def get_db() -> Generator[Session, None, None]:
     """
     Creates a database session and handles cleanup
@@ -44,6 +92,21 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async session dependency for the API handlers
+
+    Example:
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            papers = await async_crud.get_papers_page(db, limit=50)
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except SQLAlchemyError:
+            await db.rollback()
+            raise
+
 """
 When yield() used during a function call, it would pass at `yield`
 and would only resume upon next(), where it remembers where the function 
@@ -1,58 +1,287 @@
-from typing import List 
-from sqlalchemy.orm import Session
+import json
+import base64
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.dialects.postgresql import insert
 from app.database.paper import Paper
-from sqlalchemy import func, desc, asc
+from app.config import RETENTION_DAYS
+from app.search_index import index_paper, unindex_paper
+from sqlalchemy import func, desc, asc, tuple_, or_, and_, literal, delete, select, Select
 from datetime import datetime, timedelta
 
+# public columns of a paper, summary + layman_summary are several KB each and only needed on the detail view
+PAPER_FIELDS = ("id", "title", "authors", "published", "summary", "layman_summary", "link", "categories", "citations")
+HEAVY_FIELDS = ("summary", "layman_summary")
+# list endpoints (feeds, search) by default => the heavy text replaced by its preview
+FEED_FIELDS = tuple(field for field in PAPER_FIELDS if field not in HEAVY_FIELDS) + ("preview",)
+SELECTABLE_FIELDS = PAPER_FIELDS + ("preview",)
+
+def _paper_row(paper: Dict) -> Dict:
+    """
+    Fetched paper dict => column values, published may still be the raw API string
+    """
+    published = paper.get('published')
+    if isinstance(published, str): # Parse string from API output 
+        published = datetime.strptime(published, "%Y-%m-%dT%H:%M:%SZ")
+
+    return {
+        "title": paper.get('title'),
+        "authors": paper.get('authors'),
+        "published": published,
+        "summary": paper.get('summary', ''),
+        "layman_summary": paper.get('layman_summary'),
+        "link": paper.get('link'),
+        "categories": paper.get('categories'),
+        "citations": paper.get('citations') or 0
+    }
+
+def create_papers(db: Session, papers: Iterable[Dict]) -> List[Paper]:
+    """
+    Inserts a batch of papers in one transaction and returns the ones actually inserted.
+
+    INSERT ... ON CONFLICT DO NOTHING RETURNING => papers whose link (or title, the primary key)
+    is already stored are skipped by postgres, no per paper check_paper / COUNT / REFRESH round trips.
+    ids are drawn from the identity sequence, so concurrent writers never collide
+    """
+    rows = [_paper_row(paper) for paper in papers] # id comes from the identity sequence
+    if not rows:
+        return []
+
+    inserted = db.scalars(
+        insert(Paper).on_conflict_do_nothing().returning(Paper), rows,
+        execution_options={"render_nulls": True} # same column set for every row => one multi row INSERT
+    ).all()
+    indexed = [(paper.title, paper.authors) for paper in inserted] # read before the commit expires every row
+    db.commit()
+
+    for title, authors in indexed:
+        index_paper(title, authors)
+    return inserted
+
 def create_paper(
         db: Session, title: str, authors: List[str], 
         published: datetime, summary: str, layman_summary: str, 
         link: str, categories: List[str], citations: int
         ) -> Paper | None:
     """
-    Creates an instance of a paper in the database 
+    Creates an instance of a paper in the database, None if it is already stored
     """
-    
-    if not check_paper(db, link):
-        return None 
-
-    # Parse string from API output 
-    published_dt = datetime.strptime(published, "%Y-%m-%dT%H:%M:%SZ")
-
-    # find id dynamically 
-    is_cited = citations > 0
-    papers_count = db.query(func.count(Paper.id)).filter(
-        (Paper.citations > 0) if is_cited else (Paper.citations == 0)
-    ).scalar() or 0
-
-    new_paper = Paper(
-        id=papers_count+1, 
-        title=title,
-        authors=authors,
-        published=published_dt,
-        summary=summary,
-        layman_summary=layman_summary,
-        link=link,
-        categories=categories,
-        citations=citations
-    )
-
-    db.add(new_paper)
-    db.commit()
-    db.refresh(new_paper)
-    return new_paper
+    inserted = create_papers(db, [{
+        "title": title, "authors": authors, "published": published, "summary": summary,
+        "layman_summary": layman_summary, "link": link, "categories": categories, "citations": citations
+    }])
+    return inserted[0] if inserted else None
 
 def get_papers(db: Session, days: int = 30, cite: bool = False) -> List[Paper]:
     """
     Retrieves papers published within the last <days> days
     For recent papers (cite=False), returns them sorted by published date (chronologically, earliest first)
-    For cited papers (cite=True), returns them ordered by id
+    For cited papers (cite=True), returns them most cited first
     """
     if not cite: 
         cutoff_date = datetime.utcnow() - timedelta(days=days)
         return db.query(Paper).filter(Paper.published >= cutoff_date).order_by(desc(Paper.published)).all()
     
-    return db.query(Paper).filter(Paper.citations != 0).order_by(Paper.id).all()
+    return db.query(Paper).filter(Paper.citations != 0).order_by(desc(Paper.citations), asc(Paper.id)).all()
+
+def parse_fields(fields: Optional[str], default: Sequence[str] = FEED_FIELDS) -> List[str]:
+    """
+    Parses a `fields=id,title,...` projection, None / empty => default
+
+    Raises ValueError on unknown fields or a selection without any field (e.g. "," / " ")
+    """
+    if not fields:
+        return list(default)
+
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    if not selected:
+        raise ValueError("no fields selected")
+    unknown = set(selected) - set(SELECTABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return selected
+
+def project_fields(query, fields: Sequence[str], required: Sequence[str] = ()):
+    """
+    Only SELECT the requested columns, the rest are deferred and never leave the db
+    
+    required => columns read internally (e.g. for cursors), loaded even if not requested
+    """
+    columns = set(fields) | set(required)
+    return query.options(load_only(*[getattr(Paper, f) for f in columns]))
+
+def encode_cursor(paper: Paper, cite: bool) -> str:
+    """
+    Opaque cursor pointing at the last paper of a page => (published, id) for recent, (citations, id) for cited
+    """
+    key = [paper.citations, paper.id] if cite else [paper.published.isoformat(), paper.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(cursor: str, cite: bool) -> list:
+    """
+    Inverse of encode_cursor, raises ValueError on a malformed / foreign cursor
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cite:
+            last_citations, last_id = key
+            return [int(last_citations), int(last_id)]
+        last_published, last_id = key
+        return [datetime.fromisoformat(last_published), int(last_id)]
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+
+def papers_page_statement(
+        limit: int, cursor: Optional[str] = None, days: int = 30, 
+        cite: bool = False, fields: Sequence[str] = FEED_FIELDS
+        ) -> Select:
+    """
+    One page (+ 1 row) of a feed, raises ValueError on a bad cursor. Shared by the sync / async readers
+    """
+    if not cite:
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        statement = select(Paper).where(Paper.published >= cutoff_date)
+        if cursor:
+            last_published, last_id = decode_cursor(cursor, cite)
+            statement = statement.where(tuple_(Paper.published, Paper.id) < tuple_(last_published, last_id))
+        statement = statement.order_by(desc(Paper.published), desc(Paper.id))
+    else:
+        statement = select(Paper).where(Paper.citations != 0)
+        if cursor:
+            last_citations, last_id = decode_cursor(cursor, cite)
+            statement = statement.where(or_( # mixed directions => no row value comparison
+                Paper.citations < last_citations,
+                and_(Paper.citations == last_citations, Paper.id > last_id)
+            ))
+        statement = statement.order_by(desc(Paper.citations), asc(Paper.id))
+
+    statement = project_fields(statement, fields, required=("id", "published", "citations"))
+    return statement.limit(limit + 1) # one extra row tells us if there is a next page
+
+def papers_page(papers: Sequence[Paper], limit: int, cite: bool) -> Tuple[List[Paper], Optional[str]]:
+    """
+    limit + 1 rows => the page and the cursor for the next one (None on the last page)
+    """
+    if len(papers) <= limit:
+        return list(papers), None
+
+    papers = papers[:limit]
+    return list(papers), encode_cursor(papers[-1], cite)
+
+def get_papers_page(
+        db: Session, limit: int, cursor: Optional[str] = None, 
+        days: int = 30, cite: bool = False, fields: Sequence[str] = FEED_FIELDS
+        ) -> Tuple[List[Paper], Optional[str]]:
+    """
+    Keyset paginated version of get_papers, each page costs one index range scan regardless of table size
+
+    Recent papers are ordered newest first on (published, id), cited papers most cited first on (citations, id). 
+    Returns the page and the cursor for the next one (None on the last page)
+
+    Only `fields` (+ the cursor columns) are loaded, see project_fields
+    """
+    statement = papers_page_statement(limit, cursor, days, cite, fields)
+    return papers_page(db.scalars(statement).all(), limit, cite)
+
+def paper_statement(paper_id: int) -> Select:
+    return select(Paper).where(Paper.id == paper_id).limit(1)
+
+def get_paper(db: Session, paper_id: int) -> Paper | None:
+    """
+    Retrieves a single paper with every column
+    """
+    return db.scalars(paper_statement(paper_id)).first()
+
+def _like_pattern(query: str) -> str:
+    """
+    %query% with LIKE wildcards in the user input escaped
+    """
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def title_search_statements(query: str, limit: int, fields: Sequence[str] = FEED_FIELDS) -> Tuple[Optional[Select], Select]:
+    """
+    (full text statement or None, trigram fallback statement) for search_titles
+    """
+    query = query.strip()
+    base = project_fields(select(Paper), fields, required=("link",))
+
+    full_text = None
+    if len(query.split()) >= 2:
+        tsquery = func.websearch_to_tsquery('english', query)
+        full_text = base.where(Paper.title_tsv.op('@@')(tsquery)).order_by(
+            desc(func.ts_rank_cd(Paper.title_tsv, tsquery)),
+            desc(func.similarity(Paper.title, query))
+        ).limit(limit)
+
+    # `query <% title` => word_similarity above pg_trgm.word_similarity_threshold, served by the GIN trigram index
+    fallback = base.where(or_(
+        Paper.title.ilike(_like_pattern(query)),
+        literal(query).op('<%')(Paper.title)
+    )).order_by(
+        desc(func.word_similarity(query, Paper.title))
+    ).limit(limit)
+    return full_text, fallback
+
+def search_titles(db: Session, query: str, limit: int, fields: Sequence[str] = FEED_FIELDS) -> List[Paper]:
+    """
+    Indexed title search (see app/database/migrations.py)
+
+    Multi word queries => full text match on title_tsv, ranked by ts_rank_cd then trigram similarity
+    Short / partial queries, or full text misses => substring + typo tolerant trigram match (pg_trgm), ranked by word_similarity
+    """
+    full_text, fallback = title_search_statements(query, limit, fields)
+    if full_text is not None:
+        papers = db.scalars(full_text).all()
+        if papers:
+            return list(papers)
+    return list(db.scalars(fallback).all())
+
+def titles_statement(titles: List[str], fields: Sequence[str] = FEED_FIELDS) -> Select:
+    return project_fields(select(Paper), fields, required=("link",)).where(Paper.title.in_(titles))
+
+def in_title_order(papers: Sequence[Paper], titles: List[str]) -> List[Paper]:
+    by_title = {paper.title: paper for paper in papers}
+    return [by_title[title] for title in titles if title in by_title]
+
+def get_papers_by_titles(db: Session, titles: List[str], fields: Sequence[str] = FEED_FIELDS) -> List[Paper]:
+    """
+    Primary key lookup of papers, returned in the order of `titles`
+    """
+    if not titles:
+        return []
+    return in_title_order(db.scalars(titles_statement(titles, fields)).all(), titles)
+
+def author_search_statement(query: str, limit: int, fields: Sequence[str] = FEED_FIELDS) -> Select:
+    return project_fields(select(Paper), fields, required=("link",)).where(
+        func.array_to_string(Paper.authors, ' ').ilike(_like_pattern(query.strip()))
+    ).limit(limit)
+
+def search_authors(db: Session, query: str, limit: int, fields: Sequence[str] = FEED_FIELDS) -> List[Paper]:
+    """
+    Case insensitive substring match over any author name
+    """
+    return list(db.scalars(author_search_statement(query, limit, fields)).all())
+
+def export_statement(fields: Sequence[str] = PAPER_FIELDS, after_id: Optional[int] = None, since: Optional[datetime] = None) -> Select:
+    """
+    Whole corpus (cited + recent, summaries included) as column tuples for /api/export, no ORM identity map
+    => constant memory when streamed with yield_per
+
+    Resumable from the last exported row: `after_id` alone walks id order (Papers_id_key), `since` walks
+    (published, id) order (papers_published_id_idx) with `after_id` breaking ties within one published
+    """
+    statement = select(*[getattr(Paper, field) for field in fields])
+    if since is None:
+        if after_id is not None:
+            statement = statement.where(Paper.id > after_id)
+        return statement.order_by(asc(Paper.id))
+
+    if after_id is None:
+        statement = statement.where(Paper.published >= since)
+    else:
+        statement = statement.where(tuple_(Paper.published, Paper.id) > tuple_(since, after_id))
+    return statement.order_by(asc(Paper.published), asc(Paper.id))
 
 def check_paper(db: Session, url: str) -> bool: 
     """
@@ -65,41 +294,40 @@ def check_paper(db: Session, url: str) -> bool:
     """
     return db.query(Paper).filter_by(link=url).first() is None  
 
-def reorder_paper_ids(db: Session, is_cited: bool) -> None:
+def existing_links(db: Session, links: List[str]) -> set:
     """
-    Reordering such that id starts from 1, and prevent gaps upon deleting 
+    Subset of links already stored, one query for a whole batch
     """
-    papers = db.query(Paper).filter(
-        (Paper.citations > 0) if is_cited else (Paper.citations == 0)
-    ).order_by(desc(Paper.published)).all() # newest paper 
+    if not links:
+        return set()
+    return {link for (link,) in db.query(Paper.link).filter(Paper.link.in_(links)).all()}
 
-    for i, paper in enumerate(papers, 1):
-        paper.id = i
+def latest_published(db: Session) -> datetime | None:
+    """
+    Publish date of the newest non cited paper => where the next scrape should resume
+    """
+    return db.query(func.max(Paper.published)).filter(Paper.citations == 0).scalar()
 
-def delete_paper(db: Session, days_old: int = 60) -> int:
+def delete_paper(db: Session, days_old: int = RETENTION_DAYS) -> int:
     """
     Deletes papers that are older than <days_old> days 
+
+    One DELETE ... RETURNING over the published index, nothing is loaded into the session
     """
     cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-    
-    papers_to_delete = db.query(Paper).filter(
-        Paper.published < cutoff_date,
-        Paper.citations == 0  # delete papers with 0 citations
+
+    deleted_titles = db.scalars(
+        delete(Paper).where(
+            Paper.published < cutoff_date,
+            Paper.citations == 0 # delete papers with 0 citations
+        ).returning(Paper.title),
+        execution_options={"synchronize_session": False}
     ).all()
-    
-    if not papers_to_delete:
-        return 0
-    
-    deleted_count = len(papers_to_delete)
-    for paper in papers_to_delete:
-        db.delete(paper)
-    
-    db.flush()
-    
-    reorder_paper_ids(db, is_cited=False)
-    
     db.commit()
-    return deleted_count
+
+    for title in deleted_titles:
+        unindex_paper(title)
+    return len(deleted_titles)
 
 if __name__ == "__main__":
     from app.database.connection import get_db
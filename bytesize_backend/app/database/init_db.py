@@ -4,7 +4,10 @@ import os
 from dotenv import load_dotenv
 from logger import setup_logging
 from app.database.paper import Base
-from sqlalchemy import create_engine, inspect
+from app.database import query_log
+from app.database.migrations import migrate
+from app.config import DB_ECHO, DB_SYNC_POOL_SIZE, DB_POOL_TIMEOUT
+from sqlalchemy import create_engine, inspect, text
 
 logger = setup_logging()
 
@@ -16,10 +19,13 @@ def init_dev_db():
     
     engine = create_engine(
         database_url,
-        echo=True, 
-        pool_size=5,
+        echo=DB_ECHO, 
+        pool_size=DB_SYNC_POOL_SIZE,
+        max_overflow=0, # DB_SYNC_POOL_SIZE is what config.py budgets per process
+        pool_timeout=DB_POOL_TIMEOUT,
         pool_pre_ping=True
     )
+    query_log.install(engine)
     
     # check tables 
     inspector = inspect(engine)
@@ -32,6 +38,8 @@ def init_dev_db():
     if not required_tables.issubset(existing_tables):
         logger.info("Table Missing")
         try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm")) # title search indexes
             Base.metadata.create_all(bind=engine)
             logger.info("Database schema created")
         except Exception as e:
@@ -39,6 +47,8 @@ def init_dev_db():
             raise
     else:
         logger.info("Database schema already exists. Skipping init.")
+
+    migrate(engine) # evolve existing databases, only records versions on a fresh one
     
     return engine
 
@@ -0,0 +1,204 @@
+"""Versioned schema migrations for the Papers table
+
+Every migration runs once, in order, in its own transaction and is recorded in schema_migrations.
+Steps are written to be no-ops on a schema that create_all already built from the current model,
+so fresh and long lived databases converge on the same schema
+"""
+
+from typing import Callable, List, NamedTuple, Union
+from sqlalchemy import Engine
+from sqlalchemy.sql import text
+from sqlalchemy.engine import Connection
+from logger import setup_logging
+
+logger = setup_logging()
+
+MIGRATION_LOCK = 727001 # pg advisory lock key => one runner at a time across workers / dynos
+
+class MigrationDeferred(Exception):
+    """
+    A step would delete data outside the CLI => the migration and everything after it wait for tests/migrate_db.py
+    """
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    steps: List[Union[str, Callable[[Connection], None]]] # SQL or a function for conditional steps
+
+def _column_exists(conn: Connection, column: str) -> bool:
+    return conn.execute(text("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'Papers' AND column_name = :column
+    """), {"column": column}).first() is not None
+
+def _constraint_exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text("""
+        SELECT 1 FROM pg_constraint WHERE conrelid = '"Papers"'::regclass AND conname = :name
+    """), {"name": name}).first() is not None
+
+def _add_id_column(conn: Connection) -> None:
+    """
+    Per feed ids numbered newest first (tests/migrate_db.py before the runner)
+    """
+    if _column_exists(conn, "id"):
+        return
+
+    conn.execute(text('ALTER TABLE "Papers" ADD COLUMN id INTEGER'))
+
+    logger.info("Assigning IDs to cited / non-cited papers")
+    conn.execute(text("""
+        WITH numbered AS (
+            SELECT title, ROW_NUMBER() OVER (
+                PARTITION BY coalesce(citations, 0) > 0 ORDER BY published DESC
+            ) AS row_num
+            FROM "Papers"
+        )
+        UPDATE "Papers" p
+        SET id = n.row_num
+        FROM numbered n
+        WHERE p.title = n.title
+    """))
+    conn.execute(text('ALTER TABLE "Papers" ALTER COLUMN id SET NOT NULL'))
+
+def _identity_id(conn: Connection) -> None:
+    """
+    Renumbers once (cited papers first in their current order, then recent papers oldest first)
+    and hands ids over to an identity sequence
+    """
+    is_identity = conn.execute(text("""
+        SELECT is_identity FROM information_schema.columns
+        WHERE table_name = 'Papers' AND column_name = 'id'
+    """)).scalar()
+
+    if is_identity != "YES":
+        logger.info("Renumbering ids")
+        conn.execute(text("""
+            WITH numbered AS (
+                SELECT title, ROW_NUMBER() OVER (
+                    ORDER BY coalesce(citations, 0) > 0 DESC,
+                             CASE WHEN coalesce(citations, 0) > 0 THEN id END,
+                             published, title
+                ) AS row_num
+                FROM "Papers"
+            )
+            UPDATE "Papers" p
+            SET id = n.row_num
+            FROM numbered n
+            WHERE p.title = n.title
+        """))
+        conn.execute(text('ALTER TABLE "Papers" ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY'))
+        conn.execute(text("""
+            SELECT setval(pg_get_serial_sequence('"Papers"', 'id'), coalesce(max(id), 0) + 1, false) FROM "Papers"
+        """))
+
+    if not _constraint_exists(conn, "Papers_id_key"):
+        conn.execute(text('ALTER TABLE "Papers" ADD CONSTRAINT "Papers_id_key" UNIQUE (id)'))
+
+def _dedupe_links(conn: Connection) -> None:
+    """
+    Duplicates from before the unique index keep their most cited / oldest inserted row.
+    Deleting rows is left to the CLI (allow_deletes), startup / import only applies it on an already clean table
+    """
+    duplicates = conn.execute(text("""
+        SELECT count(*) - count(DISTINCT link) FROM "Papers" WHERE link IS NOT NULL
+    """)).scalar()
+    if not duplicates:
+        return
+    if not conn.info.get("allow_deletes"):
+        raise MigrationDeferred(f"{duplicates} duplicate link rows to delete, run python -m tests.migrate_db")
+
+    deleted = conn.execute(text("""
+        DELETE FROM "Papers" p
+        USING (
+            SELECT ctid, ROW_NUMBER() OVER (
+                PARTITION BY link ORDER BY coalesce(citations, 0) DESC, ctid
+            ) AS row_num
+            FROM "Papers"
+            WHERE link IS NOT NULL
+        ) d
+        WHERE p.ctid = d.ctid AND d.row_num > 1
+    """)).rowcount
+    logger.warning(f"Deleted {deleted} duplicate link rows")
+
+MIGRATIONS = [
+    Migration(1, "per feed id column", [_add_id_column]),
+    Migration(2, "title search => pg_trgm + generated tsvector", [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        """
+        ALTER TABLE "Papers"
+        ADD COLUMN IF NOT EXISTS title_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(title, ''))) STORED
+        """,
+        'CREATE INDEX IF NOT EXISTS papers_title_trgm_idx ON "Papers" USING gin (title gin_trgm_ops)',
+        'CREATE INDEX IF NOT EXISTS papers_title_tsv_idx ON "Papers" USING gin (title_tsv)',
+    ]),
+    Migration(3, "unique link => ingest dedupes with ON CONFLICT DO NOTHING", [
+        _dedupe_links,
+        'CREATE UNIQUE INDEX IF NOT EXISTS papers_link_key ON "Papers" (link)',
+    ]),
+    Migration(4, "identity id", [
+        _identity_id,
+        "DROP INDEX IF EXISTS papers_id_idx", # covered by the unique constraint
+        "DROP INDEX IF EXISTS papers_id_citations_idx",
+    ]),
+    Migration(5, "feed + retention indexes", [
+        # recent feed keyset (published, id) both directions + retention's published < cutoff
+        'CREATE INDEX IF NOT EXISTS papers_published_id_idx ON "Papers" (published, id)',
+        # cited feed => only the few thousand cited rows, already in display order
+        'CREATE INDEX IF NOT EXISTS papers_cited_idx ON "Papers" (citations DESC, id) WHERE citations <> 0',
+    ]),
+]
+
+def migrate(engine: Engine, allow_deletes: bool = False) -> List[int]:
+    """
+    Applies every pending migration, returns the versions applied by this call
+
+    Each transaction takes a transaction level advisory lock => released with its commit / rollback even behind
+    the transaction pooler, where a session level lock and its unlock can land on different backends.
+    allow_deletes => steps may delete rows (CLI), otherwise such a migration and the ones after it are deferred
+    """
+    applied_now = []
+    with engine.connect() as conn:
+        conn.info["allow_deletes"] = allow_deletes
+        with conn.begin():
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK})
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """))
+            applied = {version for (version,) in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+        for migration in MIGRATIONS:
+            if migration.version in applied:
+                continue
+
+            try:
+                with conn.begin(): # all or nothing per migration
+                    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK})
+                    done = conn.execute(
+                        text("SELECT 1 FROM schema_migrations WHERE version = :version"), {"version": migration.version}
+                    ).first()
+                    if done is not None: # another runner got there while this one waited for the lock
+                        continue
+
+                    logger.info(f"Applying migration {migration.version}: {migration.description}")
+                    for step in migration.steps:
+                        if callable(step):
+                            step(conn)
+                        else:
+                            conn.execute(text(step))
+                    conn.execute(
+                        text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                        {"version": migration.version, "description": migration.description}
+                    )
+            except MigrationDeferred as e:
+                logger.warning(f"Migration {migration.version} deferred: {e}")
+                break
+            applied_now.append(migration.version)
+
+    if applied_now:
+        logger.info(f"Migrations applied: {applied_now}")
+    return applied_now
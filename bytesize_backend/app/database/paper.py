@@ -1,13 +1,17 @@
 """Data model class for POSTGRES"""
 
+from sqlalchemy.orm import deferred, column_property
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, ARRAY, DateTime
+from sqlalchemy import Column, Integer, String, ARRAY, DateTime, Computed, Identity, Index, func
 
 Base = declarative_base()
 
+PREVIEW_CHARS = 320 # ~5 lines of a feed card
+
 class Paper(Base):
     __tablename__ = "Papers"
-    id = Column(Integer, nullable=False)
+    id = Column(Integer, Identity(), nullable=False, unique=True) # stable across deletes, display order is queried
     title = Column(String, primary_key=True)
     authors = Column(ARRAY(String), nullable=True)
     published = Column(DateTime, nullable=True)
@@ -15,4 +19,19 @@ class Paper(Base):
     layman_summary = Column(String, nullable=True)
     link = Column(String, nullable=True)
     categories = Column(ARRAY(String), nullable=True)
-    citations = Column(Integer, nullable=True)
\ No newline at end of file
+    citations = Column(Integer, nullable=True)
+
+    # start of summary cut by postgres => feeds never ship the full text, only loaded when asked for
+    preview = column_property(func.left(summary, PREVIEW_CHARS), deferred=True)
+
+    # search only, maintained by postgres and never loaded unless asked for
+    title_tsv = deferred(Column(TSVECTOR, Computed("to_tsvector('english', coalesce(title, ''))", persisted=True)))
+
+    # kept in sync with app/database/migrations.py
+    __table_args__ = (
+        Index("papers_link_key", "link", unique=True), # dedupes ingest => INSERT ... ON CONFLICT DO NOTHING
+        Index("papers_published_id_idx", "published", "id"), # recent feed keyset + retention
+        Index("papers_cited_idx", citations.desc(), id, postgresql_where=(citations != 0)), # cited feed
+        Index("papers_title_trgm_idx", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}), # needs pg_trgm
+        Index("papers_title_tsv_idx", "title_tsv", postgresql_using="gin"),
+    )
@@ -0,0 +1,76 @@
+"""Sampled slow query log, replaces echo=True
+
+Every statement is timed through the engine's cursor events (two perf_counter calls), only statements
+slower than SLOW_QUERY_MS are fingerprinted, counted and - for a SLOW_QUERY_SAMPLE share of them - logged
+"""
+
+import re
+import time
+import random
+import hashlib
+from collections import Counter
+from typing import Dict
+from sqlalchemy import Engine, event
+from logger import setup_logging
+from app.config import SLOW_QUERY_MS, SLOW_QUERY_SAMPLE
+
+logger = setup_logging()
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+BIND_PARAMS = re.compile(r"%\(\w+\)s|\$\d+|%s|\?")
+VALUE_LISTS = re.compile(r"\((?:\s*\?\s*,)*\s*\?\s*\)") # IN (?, ?, ?) / VALUES (?, ?) of any length
+
+slow_queries: Counter = Counter() # fingerprint => slow executions since start, sampled or not
+_statements: Dict[str, str] = {} # fingerprint => one normalized example
+
+def normalize(statement: str) -> str:
+    """
+    Literals and bind parameters => ?, so executions differing only in values share a fingerprint
+    """
+    statement = BIND_PARAMS.sub("?", statement)
+    statement = LITERALS.sub("?", statement)
+    statement = " ".join(statement.split())
+    return VALUE_LISTS.sub("(?+)", statement)
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize(statement).encode()).hexdigest()[:12]
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+
+    key = fingerprint(statement)
+    slow_queries[key] += 1
+    _statements.setdefault(key, normalize(statement))
+    if random.random() < SLOW_QUERY_SAMPLE:
+        logger.warning(
+            f" slow query {elapsed_ms:.0f}ms [{key}] (#{slow_queries[key]}, rows={cursor.rowcount}) "
+            f"{_statements[key][:500]}"
+        )
+
+def _handle_error(context):
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop() # failed statements never reach after_cursor_execute
+
+def install(engine: Engine) -> None:
+    """
+    Attach to a sync engine, for an AsyncEngine pass async_engine.sync_engine
+    """
+    if SLOW_QUERY_MS < 0: # disabled
+        return
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def report(top: int = 10) -> Dict[str, dict]:
+    """
+    Most frequent slow statements, fingerprint => {"count", "statement"}
+    """
+    return {key: {"count": count, "statement": _statements[key]} for key, count in slow_queries.most_common(top)}
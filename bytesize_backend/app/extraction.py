@@ -0,0 +1,133 @@
+"""PDF text extraction engine => streamed downloads to a capped spool file, parsing in a process pool"""
+
+import os
+import re
+import asyncio
+import tempfile
+import multiprocessing
+import PyPDF2
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from logger import setup_logging, setup_worker_logging
+from app.api import http_client
+
+logger = setup_logging()
+
+MAX_PDF_BYTES = 50 * 1024 * 1024 # larger downloads are aborted
+CHUNK_SIZE = 64 * 1024
+PDF_DEADLINE = 60 # seconds incl. retries
+EXTRACT_WORKERS = max(1, (os.cpu_count() or 2) - 1) # leave a core for the api
+
+# a line that is only the references heading e.g. "References", "7 References", "BIBLIOGRAPHY"
+REFERENCES_HEADING = re.compile(r'^\s*(?:\d+\.?\s*)?(?:references|bibliography)\s*$', re.IGNORECASE | re.MULTILINE)
+
+class PDFTooLarge(ValueError):
+    pass
+
+@dataclass
+class ExtractionResult:
+    text: str
+    pages_total: int
+    pages_read: int # pages parsed before hitting the references
+    hit_references: bool
+    pdf_bytes: int
+
+def pdf_url(url: str) -> str:
+    """
+    arxhiv link => id/abs/title => id/pdf/title
+    """
+    return re.sub(r'\/abs\/', '/pdf/', url)
+
+def download_pdf(url: str, max_bytes: int = MAX_PDF_BYTES) -> str:
+    """
+    Streams the PDF into a temp spool file and returns its path, the caller removes it.
+
+    Never holds more than CHUNK_SIZE in memory, raises PDFTooLarge past max_bytes
+    """
+    response = http_client.get(pdf_url(url), deadline=PDF_DEADLINE, stream=True)
+    try:
+        response.raise_for_status()
+        if int(response.headers.get("Content-Length") or 0) > max_bytes:
+            raise PDFTooLarge(f"{url} is {response.headers['Content-Length']} bytes")
+
+        fd, path = tempfile.mkstemp(prefix="bytesize-", suffix=".pdf")
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as spool:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise PDFTooLarge(f"{url} exceeds {max_bytes} bytes")
+                    spool.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path
+    finally:
+        response.close()
+
+def extract_file(path: str) -> ExtractionResult:
+    """
+    Extracts text from a PDF on disk, each page once, up to the references heading
+
+    Module level + path argument => picklable, runs inside the process pool
+    """
+    reader = PyPDF2.PdfReader(path)
+
+    pages = []
+    hit_references = False
+    for page in reader.pages:
+        page_text = page.extract_text() or ""
+        heading = REFERENCES_HEADING.search(page_text)
+        if heading:
+            pages.append(page_text[:heading.start()]) # keep whatever precedes the heading on that page
+            hit_references = True
+            break
+        pages.append(page_text)
+
+    return ExtractionResult(
+        text="\n\n".join(pages),
+        pages_total=len(reader.pages),
+        pages_read=len(pages),
+        hit_references=hit_references,
+        pdf_bytes=os.path.getsize(path)
+    )
+
+_pool = None
+
+def extraction_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork => no copied locks / threads of the running server, workers log to stderr themselves
+        _pool = ProcessPoolExecutor(
+            max_workers=EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=setup_worker_logging,
+        )
+    return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+async def extract_in_pool(path: str) -> ExtractionResult:
+    """
+    CPU bound PyPDF2 parsing off the event loop thread and across cores, removes the spool file after
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(extraction_pool(), extract_file, path)
+    finally:
+        os.remove(path)
+
+def extract_pdf(url: str) -> ExtractionResult:
+    """
+    Synchronous download + extraction in the calling process, for scripts
+    """
+    path = download_pdf(url)
+    try:
+        return extract_file(path)
+    finally:
+        os.remove(path)
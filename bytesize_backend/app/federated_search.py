@@ -0,0 +1,111 @@
+"""Federated paper search => every source queried concurrently under one per request deadline"""
+
+import time
+import asyncio
+from itertools import takewhile
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+from logger import setup_logging
+from app.api.atom import arxiv_id
+
+logger = setup_logging()
+
+def dedupe_key(paper: Dict) -> Optional[str]:
+    """
+    Same paper across sources => same key (arXiv id without version), links that are not arXiv fall back
+    to the link, then the title
+    """
+    return (arxiv_id(paper.get("link")) or "").lower() or paper.get("link") or (paper.get("title") or "").strip().lower() or None
+
+@dataclass
+class FederatedResult:
+    papers: List[Dict]
+    sources: Dict[str, str] = field(default_factory=dict) # source => ok | timeout | error | skipped
+
+    def sources_header(self) -> str:
+        return ", ".join(f"{source}={status}" for source, status in self.sources.items())
+
+def merge(results: Dict[str, List[Dict]], order: List[str], max_results: int) -> List[Dict]:
+    """
+    Sources in priority order, first occurrence of a paper wins
+    """
+    merged, seen = [], set()
+    for source in order:
+        for paper in results.get(source) or []:
+            key = dedupe_key(paper)
+            if key is not None and key in seen:
+                continue
+            seen.add(key)
+            merged.append(paper)
+            if len(merged) >= max_results:
+                return merged
+    return merged
+
+class SourceSkipped(Exception):
+    """
+    Raised by a source that declines to run (e.g. no rate limiter slot in time) => reported as "skipped", not "error"
+    """
+
+async def federated_search(
+        sources: Dict[str, Callable[[float], Awaitable[List[Dict]]]], max_results: int, deadline: float,
+        head_start: Optional[Dict[str, float]] = None
+        ) -> FederatedResult:
+    """
+    Runs the sources concurrently and merges them in the given (priority) order
+
+    Each source is a factory called with the seconds left until the deadline. A source listed in `head_start`
+    is only started once every source ahead of it finished without filling max_results, or once its head start
+    (seconds) is over => a slow / rate limited backup source costs nothing when the primary one fills the page.
+
+    Returns early once the sources ahead of everything still running already fill max_results
+    (the rest are "skipped"), otherwise returns what arrived when `deadline` seconds are up (the rest are "timeout").
+    A failing source is logged and reported as "error", it never fails the search
+    """
+    order = list(sources)
+    head_start = head_start or {}
+    tasks: Dict[asyncio.Future, str] = {}
+    waiting = list(order) # not started yet
+    results: Dict[str, List[Dict]] = {}
+    status: Dict[str, str] = {}
+    start = time.monotonic()
+    end = start + deadline
+
+    while True:
+        # every source ahead of the first unfinished one is in => enough results means nothing left can change the page
+        finished = list(takewhile(lambda name: name in status, order))
+        if len(merge(results, finished, max_results)) >= max_results:
+            break
+
+        now = time.monotonic()
+        for name in list(waiting):
+            if now - start >= head_start.get(name, 0) or all(ahead in status for ahead in order[:order.index(name)]):
+                waiting.remove(name)
+                tasks[asyncio.ensure_future(sources[name](end - now))] = name
+
+        pending = [task for task, name in tasks.items() if name not in status]
+        remaining = end - now
+        if not pending or remaining <= 0:
+            break
+        timeout = min([remaining] + [start + head_start.get(name, 0) - now for name in waiting]) # next head start
+        done, _ = await asyncio.wait(pending, timeout=max(0.0, timeout), return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            name = tasks[task]
+            try:
+                results[name] = task.result() or []
+                status[name] = "ok"
+            except SourceSkipped as e:
+                logger.info(f" {name} search skipped: {e}")
+                status[name] = "skipped"
+            except Exception as e:
+                logger.error(f" {name} search fail: {e}")
+                status[name] = "error"
+
+    timed_out = time.monotonic() >= end
+    for task, name in tasks.items():
+        if name not in status:
+            task.cancel()
+            status[name] = "timeout" if timed_out else "skipped"
+    for name in waiting:
+        status[name] = "skipped"
+
+    return FederatedResult(merge(results, order, max_results), {name: status[name] for name in order})
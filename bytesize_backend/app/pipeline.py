@@ -0,0 +1,201 @@
+"""Staged async ingestion pipeline: fetch => download => extract => summarize => store"""
+
+import os
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from logger import setup_logging
+from app.database.connection import get_db
+from app.database.crud import create_papers, existing_links
+from app.snapshot import refresh_feeds
+from app.summarizer import summarize, dispatcher
+from app.text_cache import text_cache
+from app.summary_cache import summary_cache, hit_rate
+from app.database import query_log
+from app.extraction import download_pdf, extract_in_pool, EXTRACT_WORKERS
+from app.config import LLM_MAX_IN_FLIGHT
+
+logger = setup_logging()
+
+# workers per stage - downloads / LLM calls are I/O bound, store is kept serial for the db
+STAGE_WORKERS = {
+    "download": 8,
+    "extract": EXTRACT_WORKERS, # one per process in the extraction pool
+    "summarize": LLM_MAX_IN_FLIGHT, # papers being summarized, the dispatcher bounds the requests themselves
+    "store": 1, # one writer, batched
+}
+QUEUE_SIZE = 16 # max papers waiting between two stages => bounds spool files / text held
+STORE_BATCH = 32 # papers per INSERT transaction
+STORE_LINGER = 2.0 # seconds the store stage waits to fill a batch
+
+_STOP = object() # sentinel pushed downstream once a stage is drained
+
+@dataclass
+class PaperJob:
+    paper: Dict
+    pdf_path: Optional[str] = None # spool file, removed by the extract stage
+    content: Optional[str] = None
+    layman_summary: Optional[str] = None
+
+@dataclass
+class PipelineStats:
+    stored: int = 0
+    skipped: Counter = field(default_factory=Counter) # stage => papers dropped
+    failed: Counter = field(default_factory=Counter) # stage => papers errored
+
+async def _download(job: PaperJob) -> Optional[PaperJob]:
+    cached = await asyncio.to_thread(text_cache.get, job.paper.get('link'))
+    if cached is not None: # text already extracted once => skip download + parsing
+        job.content = cached.text
+        return job
+
+    job.pdf_path = await asyncio.to_thread(download_pdf, job.paper.get('link'))
+    return job
+
+async def _extract(job: PaperJob) -> Optional[PaperJob]:
+    if job.content is not None: # text cache hit
+        return job if job.content else None
+
+    result = await extract_in_pool(job.pdf_path)
+    job.pdf_path = None
+    await asyncio.to_thread(text_cache.put, job.paper.get('link'), result)
+    logger.info(f" extracted {job.paper.get('link')} - {result.pages_read}/{result.pages_total} pages, {len(result.text)} chars")
+    job.content = result.text
+    return job if job.content else None
+
+async def _summarize(job: PaperJob) -> Optional[PaperJob]:
+    job.layman_summary = await summarize(job.content)
+    job.content = None
+    return job if job.layman_summary else None
+
+def _store_papers(jobs: List[PaperJob]) -> int:
+    with next(get_db()) as db:
+        return len(create_papers(db, [
+            {**job.paper, 'layman_summary': job.layman_summary} for job in jobs
+        ])) # papers already stored are skipped by the insert
+
+def _stored_links(links) -> set:
+    with next(get_db()) as db:
+        return existing_links(db, links)
+
+async def _store_stage(inbox: asyncio.Queue, stats: PipelineStats) -> None:
+    """
+    Single writer, collects summarized papers into batches of up to STORE_BATCH and writes each
+    batch in one transaction. A partial batch is flushed after STORE_LINGER seconds without new papers
+    """
+    done = False
+    while not done:
+        batch = []
+        job = await inbox.get()
+        while job is not _STOP:
+            batch.append(job)
+            if len(batch) >= STORE_BATCH:
+                break
+            try:
+                job = await asyncio.wait_for(inbox.get(), STORE_LINGER)
+            except asyncio.TimeoutError:
+                break
+        done = job is _STOP
+        if not batch:
+            continue
+
+        try:
+            stored = await asyncio.to_thread(_store_papers, batch)
+        except Exception as e:
+            logger.error(f"store failed for a batch of {len(batch)}: {e}")
+            stats.failed["store"] += len(batch)
+            continue
+        stats.stored += stored
+        stats.skipped["store"] += len(batch) - stored
+
+async def _run_stage(
+        name: str, handler: Callable[[PaperJob], Awaitable[Optional[PaperJob]]],
+        inbox: asyncio.Queue, outbox: asyncio.Queue,
+        downstream_workers: int, stats: PipelineStats
+        ) -> None:
+    """
+    Runs STAGE_WORKERS[name] workers pulling from inbox and pushing into outbox.
+
+    Once every worker has seen a _STOP, one _STOP per downstream worker is forwarded
+    """
+    async def worker():
+        while True:
+            job = await inbox.get()
+            if job is _STOP:
+                return
+
+            try:
+                result = await handler(job)
+            except Exception as e:
+                logger.error(f"{name} failed for {job.paper.get('link')}: {e}")
+                stats.failed[name] += 1
+                continue
+
+            if result is None:
+                stats.skipped[name] += 1
+            else:
+                await outbox.put(result) # blocks when downstream is full => backpressure
+
+    await asyncio.gather(*(worker() for _ in range(STAGE_WORKERS[name])))
+
+    for _ in range(downstream_workers):
+        await outbox.put(_STOP)
+
+async def run_pipeline(papers: Iterable[Dict]) -> PipelineStats:
+    """
+    Pushes fetched paper metadata through download => extract => summarize => store.
+
+    Every stage runs its own pool of workers and stages are joined by bounded queues,
+    so a slow stage (usually the LLM) throttles the ones before it instead of piling up pdfs
+    """
+    stats = PipelineStats()
+    stages = [
+        ("download", _download),
+        ("extract", _extract),
+        ("summarize", _summarize),
+    ]
+    queues = [asyncio.Queue(maxsize=QUEUE_SIZE) for _ in range(len(stages) + 1)] # + store stage inbox
+
+    tasks = []
+    for i, (name, handler) in enumerate(stages):
+        downstream = STAGE_WORKERS[stages[i + 1][0]] if i + 1 < len(stages) else STAGE_WORKERS["store"]
+        tasks.append(asyncio.create_task(
+            _run_stage(name, handler, queues[i], queues[i + 1], downstream, stats)
+        ))
+    tasks.append(asyncio.create_task(_store_stage(queues[-1], stats)))
+
+    papers = list(papers)
+    stored = await asyncio.to_thread(_stored_links, [paper.get('link') for paper in papers])
+    stats.skipped["fetch"] = len([paper for paper in papers if paper.get('link') in stored])
+
+    # fetch stage => feeds the first queue, papers already in the db never cost a download / LLM call
+    try:
+        for paper in papers:
+            if paper.get('link') in stored:
+                continue
+            await queues[0].put(PaperJob(paper=paper))
+        for _ in range(STAGE_WORKERS[stages[0][0]]):
+            await queues[0].put(_STOP)
+
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        for queue in queues: # cancelled mid run => drop spool files of jobs still queued
+            while not queue.empty():
+                job = queue.get_nowait()
+                if job is not _STOP and job.pdf_path and os.path.exists(job.pdf_path):
+                    os.remove(job.pdf_path)
+        await dispatcher.aclose() # its http client belongs to this loop, scripts asyncio.run one pipeline per batch
+
+    if stats.stored:
+        await asyncio.to_thread(refresh_feeds) # feeds changed => drop + rebuild cached pages
+
+    logger.info(f" pipeline done - stored: {stats.stored}, skipped: {dict(stats.skipped)}, failed: {dict(stats.failed)}")
+    logger.info(f" text cache hits: {text_cache.hits}, misses: {text_cache.misses}")
+    logger.info(f" LLM calls: {dispatcher.completed}, rate limited: {dispatcher.rate_limited}, failed: {dispatcher.failed}")
+    logger.info(f" summary cache hits: {summary_cache.hits}, misses: {summary_cache.misses} ({hit_rate():.0%} hit rate)")
+    for key, slow in query_log.report(top=3).items():
+        logger.info(f" slow query [{key}] x{slow['count']}: {slow['statement'][:200]}")
+    return stats
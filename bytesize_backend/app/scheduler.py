@@ -1,14 +1,36 @@
 import asyncio
 from logger import setup_logging
-from app.summarizer import simple_summary, extract_pdf_content
+from app.pipeline import run_pipeline
+from app.api.harvester import harvest
 from app.database.connection import get_db
-from app.database.crud import create_paper
+from app.database.crud import latest_published, delete_paper
+from app.snapshot import refresh_feeds
 from app.api.arxiv import fetch_recent_papers
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
 
 logger = setup_logging()
 
-MAX_TRIES = 8 
+MAX_BACKFILL_DAYS = 8 # furthest back a scheduled run will go to fill days the server was down
+
+def _scrape_start() -> date:
+    """
+    Day of the newest stored paper, so missed days are backfilled, capped at MAX_BACKFILL_DAYS
+    """
+    with next(get_db()) as db:
+        latest = latest_published(db)
+    earliest = date.today() - timedelta(days=MAX_BACKFILL_DAYS)
+    return max(latest.date(), earliest) if latest else earliest
+
+def _expire_papers() -> int:
+    """
+    Enforces the RETENTION_DAYS window, cited papers are kept
+    """
+    with next(get_db()) as db:
+        deleted = delete_paper(db)
+    if deleted:
+        refresh_feeds()
+    logger.info(f"retention removed {deleted} papers")
+    return deleted
 
 async def scheduled_scraper():
     """
@@ -25,76 +47,22 @@ async def scheduled_scraper():
         # scrape after wait 
         logger.info("scheduled paper scraping")
         try:
-            for look_back in range(MAX_TRIES):
-                data = fetch_recent_papers(days_back=look_back)
-                
-                if data:
-                    with next(get_db()) as db:
-                        for paper_data in data:
-                            try:
-                                title = paper_data.get('title')
-                                authors = paper_data.get('authors')
-                                published = paper_data.get('published')
-                                summary = paper_data.get('summary', '')
-                                link = paper_data.get('link')
-                                categories = paper_data.get('categories')
-                                citations = paper_data.get('citations', 0)
-
-                                # summarizer 
-                                content = extract_pdf_content(link)
-                                layman_summary = simple_summary(content)
+            start = await asyncio.to_thread(_scrape_start)
+            batches = harvest(start, date.today())
 
-                                if not layman_summary:
-                                    continue  
-
-                                create_paper(
-                                    db=db,
-                                    title=title,
-                                    authors=authors,
-                                    published=published,
-                                    summary=summary,
-                                    layman_summary=layman_summary,
-                                    link=link,
-                                    categories=categories,
-                                    citations=citations
-                                )
-                                logger.info(f" stored successfully")
-                            except Exception as e:
-                                logger.error("Failed to store", str(e))
-                        break 
-                else:
-                    logger.warning(f" 0 papers fetched - {look_back+1}/5 Tries")
+            # harvest blocks on http => advance it in a worker thread to keep event loop free for api
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                await run_pipeline(batch)
         except Exception as e:
             logger.error(str(e))
 
+        try:
+            await asyncio.to_thread(_expire_papers)
+        except Exception as e:
+            logger.error(f"retention failed: {e}")
+
 if __name__ == "__main__":
 
     # manually fetch papers 
     data = fetch_recent_papers(days_back=3)
-            
-    with next(get_db()) as db:
-        for paper_data in data:
-
-            title = paper_data.get('title')
-            authors = paper_data.get('authors')
-            published = paper_data.get('published')
-            summary = paper_data.get('summary', '')
-            link = paper_data.get('link')
-            categories = paper_data.get('categories')
-            citations = paper_data.get('citations', 0)
-
-            # summarizer 
-            content = extract_pdf_content(link)
-            layman_summary = simple_summary(content)
-
-            create_paper(
-                db=db,
-                title=title,
-                authors=authors,
-                published=published,
-                summary=summary,
-                layman_summary=layman_summary,
-                link=link,
-                categories=categories,
-                citations=citations
-            )
\ No newline at end of file
+    asyncio.run(run_pipeline(data))
@@ -0,0 +1,185 @@
+"""In-memory trigram index over titles / authors of stored papers"""
+
+import re
+import heapq
+from bisect import bisect_left
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from logger import setup_logging
+from app.database.paper import Paper
+
+logger = setup_logging()
+
+N = 3
+MIN_COVERAGE = 0.5 # share of query trigrams a doc must contain => tolerates ~1 typo per short word
+COMPACT_RATIO = 0.25 # tombstones per live doc that trigger a compaction
+COMPACT_MIN = 64 # ... but never for fewer tombstones than this
+
+_EMPTY = array('I')
+
+def _words(text: str) -> List[str]:
+    return re.sub(r'[^\w]+', ' ', text.lower()).split()
+
+def ngrams(text: str, prefix: bool = False) -> List[str]:
+    """
+    pg_trgm style trigrams => each word padded with 2 leading + 1 trailing space
+
+    prefix => last word is still being typed, skip its trailing pad so "atten" matches "attention"
+    """
+    words = _words(text)
+    grams = []
+    for i, word in enumerate(words):
+        padded = "  " + word + ("" if prefix and i == len(words) - 1 else " ")
+        grams.extend(padded[j:j + N] for j in range(len(padded) - N + 1))
+    return list(dict.fromkeys(grams)) # dedupe, keep order
+
+def trigram_score(query: str, text: str) -> float:
+    """
+    Share of the query trigrams found in text, ties broken in favour of shorter texts
+    """
+    query_grams = ngrams(query, prefix=True)
+    if not query_grams:
+        return 0.0
+    text_grams = ngrams(text)
+    hits = len(set(query_grams).intersection(text_grams))
+    return hits / len(query_grams) - len(text_grams) * 1e-6
+
+class NgramIndex:
+    """
+    Inverted index: trigram => compact array('I') of doc ids
+
+    Docs are keyed by paper title (the primary key), add / remove are incremental. Removed docs
+    are tombstoned and compacted away once they exceed COMPACT_RATIO of the live docs
+    """
+    def __init__(self):
+        self.ready = False
+        self._postings: Dict[str, array] = {}
+        self._keys: List[Optional[str]] = [] # doc id => title, None once removed
+        self._lengths = array('I') # doc id => number of trigrams
+        self._ids: Dict[str, int] = {} # title => doc id
+        self._tombstones = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, key: str, text: str) -> None:
+        grams = ngrams(text)
+        with self._lock:
+            self._remove(key)
+            doc_id = len(self._keys)
+            self._keys.append(key)
+            self._lengths.append(len(grams))
+            self._ids[key] = doc_id
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = array('I')
+                posting.append(doc_id)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        doc_id = self._ids.pop(key, None)
+        if doc_id is not None:
+            self._keys[doc_id] = None
+            self._tombstones += 1
+            if self._tombstones > max(COMPACT_MIN, len(self._ids) * COMPACT_RATIO):
+                self._compact()
+
+    def _compact(self) -> None:
+        """
+        Drops tombstoned docs from every posting and renumbers the live ones in order,
+        so postings stay sorted for the binary search in search()
+        """
+        remap = array('i', [-1]) * len(self._keys)
+        keys, lengths = [], array('I')
+        for doc_id, key in enumerate(self._keys):
+            if key is not None:
+                remap[doc_id] = len(keys)
+                keys.append(key)
+                lengths.append(self._lengths[doc_id])
+
+        postings = {}
+        for gram, posting in self._postings.items():
+            live = array('I', [remap[doc_id] for doc_id in posting if remap[doc_id] >= 0])
+            if live:
+                postings[gram] = live
+
+        self._postings, self._keys, self._lengths = postings, keys, lengths
+        self._ids = {key: doc_id for doc_id, key in enumerate(keys)}
+        self._tombstones = 0
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Returns up to `limit` (title, score) pairs, best first
+        """
+        grams = ngrams(query, prefix=True)
+        if not grams:
+            return []
+
+        with self._lock:
+            postings = sorted((self._postings.get(gram, _EMPTY) for gram in grams), key=len)
+            min_hits = max(1, int(len(grams) * MIN_COVERAGE + 0.5))
+
+            # a doc with >= min_hits matches must appear in one of the (len - min_hits + 1) rarest postings,
+            # so only those are scanned in full. longer postings just verify the candidates
+            hits = Counter()
+            cutoff = len(postings) - min_hits + 1
+            for posting in postings[:cutoff]:
+                hits.update(posting) # counts in C, no per doc python loop
+
+            for posting in postings[cutoff:]:
+                if len(posting) < 4 * len(hits):
+                    hits.update(posting)
+                    continue
+                for doc_id in hits: # postings are sorted (doc ids only grow) => binary search
+                    i = bisect_left(posting, doc_id)
+                    if i < len(posting) and posting[i] == doc_id:
+                        hits[doc_id] += 1
+
+            scored = [
+                (count / len(grams) - self._lengths[doc_id] * 1e-6, doc_id)
+                for doc_id, count in hits.items()
+                if count >= min_hits and self._keys[doc_id] is not None
+            ]
+            best = heapq.nlargest(limit, scored)
+            return [(self._keys[doc_id], score) for score, doc_id in best]
+
+    def rebuild(self, docs: Iterable[Tuple[str, str]]) -> None:
+        fresh = NgramIndex()
+        for key, text in docs:
+            fresh.add(key, text)
+
+        with self._lock:
+            self._postings, self._keys, self._lengths, self._ids = fresh._postings, fresh._keys, fresh._lengths, fresh._ids
+            self._tombstones = fresh._tombstones
+            self.ready = True
+
+title_index = NgramIndex()
+author_index = NgramIndex()
+
+def index_paper(title: str, authors: Optional[List[str]]) -> None:
+    """
+    Called on every insert so the index never needs a full rebuild while running
+    """
+    title_index.add(title, title)
+    author_index.add(title, " ".join(authors or []))
+
+def unindex_paper(title: str) -> None:
+    title_index.remove(title)
+    author_index.remove(title)
+
+def load_indexes(db: Session) -> None:
+    """
+    Builds both indexes from the db, only title + authors are read
+    """
+    rows = db.query(Paper.title, Paper.authors).all()
+    title_index.rebuild((title, title) for title, _ in rows)
+    author_index.rebuild((title, " ".join(authors or [])) for title, authors in rows)
+    logger.info(f" search index loaded - {len(rows)} papers, {len(title_index._postings)} title trigrams")
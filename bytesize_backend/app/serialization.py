@@ -0,0 +1,63 @@
+"""Response bodies straight to bytes with orjson
+
+Handlers return json_response(...) instead of dicts, so FastAPI skips jsonable_encoder + its own
+json.dumps pass. Output matches that path: naive datetimes as isoformat, None as null
+"""
+
+import io
+import csv
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Optional, Sequence
+import orjson
+from fastapi import Response
+from app.database.crud import PAPER_FIELDS, FEED_FIELDS
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content)
+
+def _getter(fields: Sequence[str]):
+    """
+    attrgetter works on ORM Papers and on Row tuples from select(Paper.id, Paper.title, ...) alike,
+    always returns a tuple
+    """
+    getter = attrgetter(*fields)
+    return getter if len(fields) > 1 else lambda paper: (getter(paper),)
+
+def paper_rows(papers: Iterable, fields: Sequence[str] = PAPER_FIELDS) -> list:
+    """
+    Papers / rows => field dicts in one pass, no per attribute Python loop
+    """
+    getter = _getter(fields)
+    return [dict(zip(fields, getter(paper))) for paper in papers]
+
+def encode_feed(papers: Iterable, next_cursor: Optional[str], fields: Sequence[str] = FEED_FIELDS) -> bytes:
+    return orjson.dumps({"papers": paper_rows(papers, fields), "next_cursor": next_cursor})
+
+def encode_ndjson(papers: Iterable, fields: Sequence[str] = PAPER_FIELDS) -> bytes:
+    """
+    One JSON object per line
+    """
+    return b"".join(orjson.dumps(row) + b"\n" for row in paper_rows(papers, fields))
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, list): # authors / categories
+        return "; ".join(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def encode_csv(papers: Iterable, fields: Sequence[str] = PAPER_FIELDS, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    getter = _getter(fields)
+    writer.writerows([_csv_value(value) for value in getter(paper)] for paper in papers)
+    return buffer.getvalue().encode()
+
+def json_response(body: bytes, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Already encoded JSON => response as is
+    """
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,125 @@
+"""In-process store of pre-serialized, gzipped feed pages"""
+
+import gzip
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional, Sequence
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from logger import setup_logging
+from app.database.connection import get_db
+from app.database.crud import get_papers_page, FEED_FIELDS
+from app.serialization import encode_feed
+from app.static_files import accepted_encodings
+
+logger = setup_logging()
+
+MAX_SNAPSHOTS = 256 # distinct (feed, limit, cursor, fields) pages kept
+SNAPSHOT_TTL = 15 * 60 # seconds, catches writes from other processes (semantic_scholar script) + the moving 30 day window
+
+class FeedSnapshot(NamedTuple):
+    body: bytes
+    gzipped: bytes
+    etag: str
+    built_at: float
+
+class SnapshotStore:
+    """
+    LRU of ready-to-send feed pages.
+
+    Ingest calls invalidate() after committing; every put() carries the generation it was
+    built from so a page queried before an invalidate can never be stored after it
+    """
+    def __init__(self, max_entries: int = MAX_SNAPSHOTS, ttl: float = SNAPSHOT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: OrderedDict[Hashable, FeedSnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[FeedSnapshot]:
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None:
+                return None
+            if time.monotonic() - snapshot.built_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return snapshot
+
+    def put(self, key: Hashable, body: bytes, generation: int) -> FeedSnapshot:
+        snapshot = FeedSnapshot(
+            body=body,
+            gzipped=gzip.compress(body, compresslevel=6),
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"', # strong => byte identical bodies only
+            built_at=time.monotonic()
+        )
+
+        with self._lock:
+            if generation == self.generation: # stale build otherwise, still served once but not kept
+                self._entries[key] = snapshot
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self) -> list:
+        """
+        Drops every page, returns the keys of first pages so they can be rebuilt
+        """
+        with self._lock:
+            self.generation += 1
+            first_pages = [key for key in self._entries if key[2] is None] # key => (cite, limit, cursor, fields)
+            self._entries.clear()
+        return first_pages
+
+feed_snapshots = SnapshotStore()
+
+def build_feed_page(
+        db: Session, cite: bool, limit: int, cursor: Optional[str],
+        fields: Sequence[str] = FEED_FIELDS
+        ) -> bytes:
+    papers, next_cursor = get_papers_page(db, limit=limit, cursor=cursor, cite=cite, fields=fields)
+    return encode_feed(papers, next_cursor, fields)
+
+def refresh_feeds() -> None:
+    """
+    Invalidates the store after an ingest commit and eagerly rebuilds the first pages that were being served
+    """
+    keys = feed_snapshots.invalidate()
+    if not keys:
+        return
+
+    generation = feed_snapshots.generation
+    with next(get_db()) as db:
+        for key in keys:
+            cite, limit, cursor, fields = key
+            feed_snapshots.put(key, build_feed_page(db, cite, limit, cursor, fields), generation)
+    logger.info(f" rebuilt {len(keys)} feed snapshots")
+
+def snapshot_response(snapshot: FeedSnapshot, request: Request) -> Response:
+    """
+    304 if the client already holds this page, else the gzip / plain body depending on Accept-Encoding
+    """
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": "no-cache", # cache, but always revalidate
+        "Vary": "Accept-Encoding",
+    }
+
+    gzipped = "gzip" in accepted_encodings(request.headers.get("accept-encoding", ""))
+    if gzipped: # strong validators differ per content-coding
+        headers["ETag"] = snapshot.etag[:-1] + '-gz"'
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzipped, media_type="application/json", headers=headers)
+
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
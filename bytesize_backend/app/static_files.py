@@ -0,0 +1,133 @@
+"""Static frontend (Next.js export) served from precompressed variants
+
+python -m app.static_files ../bytesize_frontend/out   # build .gz / .br next to every compressible file
+
+Variants are built once (Dockerfile after `npm run build`, or at startup for anything missing / stale),
+requests only pick a file => no per request compression on the API worker
+"""
+
+import os
+import sys
+import gzip
+import mimetypes
+from typing import Dict, Optional
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+from logger import setup_logging
+
+try:
+    import brotli
+except ImportError: # gzip only
+    brotli = None
+
+logger = setup_logging()
+
+COMPRESSIBLE = {".html", ".js", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest", ".ico"}
+MIN_SIZE = 1024 # bytes, smaller files gain less than the extra header costs
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")] # preference order when the client accepts both
+
+HASHED_PREFIX = "_next/static/" # content hashed file names => never change under the same url
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache" # html / unhashed files => cache but revalidate with the ETag
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0) # mtime=0 => byte identical rebuilds
+
+def precompress(directory: str) -> Dict[str, Dict[str, str]]:
+    """
+    Writes the missing / stale variants under directory, keeps only the ones that are actually smaller
+
+    Returns original path => {encoding: variant path}
+    """
+    variants, built = {}, 0
+    directory = os.path.realpath(directory) # StaticFiles.lookup_path resolves to real paths
+    encodings = [(encoding, suffix) for encoding, suffix in ENCODINGS if encoding != "br" or brotli is not None]
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE or os.path.getsize(path) < MIN_SIZE:
+                continue
+
+            data = None
+            for encoding, suffix in encodings:
+                variant = path + suffix
+                if not os.path.exists(variant) or os.path.getmtime(variant) < os.path.getmtime(path):
+                    if data is None:
+                        with open(path, "rb") as f:
+                            data = f.read()
+                    with open(variant, "wb") as f:
+                        f.write(_compress(data, encoding))
+                    built += 1
+                if os.path.getsize(variant) < os.path.getsize(path):
+                    variants.setdefault(path, {})[encoding] = variant
+
+    logger.info(f" static files: {len(variants)} compressible, {built} variants built")
+    return variants
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """
+    "br;q=1.0, gzip, deflate, identity;q=0" => {"br", "gzip", "deflate", "identity"} minus q=0 entries
+    """
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip())
+    return accepted
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that answers with the .br / .gz variant the client accepts, immutable caching for
+    hashed Next.js assets and ETag revalidation (304) for everything else
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.variants = precompress(self.directory) if self.directory else {}
+
+    def _variant(self, full_path: str, request_headers: Headers) -> Optional[tuple]:
+        variants = self.variants.get(str(full_path))
+        if not variants:
+            return None
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, _ in ENCODINGS:
+            if encoding in variants and encoding in accepted:
+                return encoding, variants[encoding]
+        return None
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+        relative = os.path.relpath(full_path, os.path.realpath(self.directory)).replace(os.sep, "/")
+        cache_control = IMMUTABLE if relative.startswith(HASHED_PREFIX) else REVALIDATE
+
+        variant = self._variant(full_path, request_headers)
+        if variant is not None:
+            encoding, variant_path = variant
+            response = FileResponse(variant_path, status_code=status_code, media_type=media_type, stat_result=os.stat(variant_path))
+            response.headers["Content-Encoding"] = encoding # ETag comes from the variant's stat => per encoding
+        else:
+            response = FileResponse(full_path, status_code=status_code, media_type=media_type, stat_result=stat_result)
+
+        response.headers["Cache-Control"] = cache_control
+        if str(full_path) in self.variants:
+            response.headers["Vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+if __name__ == "__main__":
+    for directory in sys.argv[1:]:
+        if os.path.isdir(directory):
+            precompress(directory)
@@ -1,11 +1,15 @@
 import os 
-import re
-import io 
-import PyPDF2
-import requests
-from openai import OpenAI
+import time
+import asyncio
+from typing import Optional
 from dotenv import load_dotenv
 from logger import setup_logging
+from app.api.llm_dispatcher import LLMDispatcher
+from app.extraction import extract_pdf
+from app.text_cache import text_cache
+from app.summary_cache import summary_cache, summary_key
+from app.chunking import count_tokens, chunk_text, select_chunks
+from app.config import SUMMARY_TOKEN_BUDGET, SUMMARY_CHUNK_TOKENS, SUMMARY_DEADLINE
 
 load_dotenv()
 logger = setup_logging()
@@ -13,65 +17,149 @@ logger = setup_logging()
 OAI_KEY = os.getenv("OPENROUTER_API_KEY")
 OR_ENDPOINT = os.getenv("OPENROUTER_ENDPOINT")
 
+LLM_DEADLINE = 120
+
+MODEL = "openai/gpt-3.5-turbo"
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that explains high level technical reports in layman terms."
+    "Ensure the output has 2 paragraphs, the first paragraph is a layman abstraction."
+    "THe second paragraph can be longer that contains the methodology and results. Also include explaining the methodology in simple terms."
+    "Do not include formatting such as **<Abstract>** / **<Methodology>**. "
+)
+MAP_PROMPT = (
+    "You are reading one part of a technical report so it can be summarized as a whole later. "
+    "Summarize the problem, methods, numbers and findings in this part in at most 5 sentences, plain text only."
+)
+
+CONTEXT_TOKENS = 16385 # gpt-3.5-turbo window, prompt + completion
+MAX_SUMMARY_TOKENS = 2048
+MAP_MAX_TOKENS = 300 # per chunk summary
+MESSAGE_OVERHEAD = 16 # chat framing tokens per request
+MAP_DEADLINE_SHARE = 0.6 # of SUMMARY_DEADLINE, the rest is left for the reduce call
+
 headers = {
     "Authorization": f"Bearer {OAI_KEY}",
     "Content-Type": "application/json",
 }
 
+dispatcher = LLMDispatcher(OR_ENDPOINT, headers) # every LLM call of the process shares its in-flight limit
+
 def extract_pdf_content(url: str) -> None:
     """
     Extracts PDF from arxhiv link => id/abs/title => id/pdf/title
     """
-    pdf_url = re.sub(r'\/abs\/', '/pdf/', url) 
-
     try: 
-        response = requests.get(pdf_url) # no need for if stat=200, since it any error => exception blk
-        pdf_file = io.BytesIO(response.content) # o/p binary content to file-like obj for pypdf2_reader
-        reader = PyPDF2.PdfReader(pdf_file)
-        
-        text = ""
-        for page_num in range(len(reader.pages)):
-            if re.search(r'\b(References)\b', reader.pages[page_num].extract_text(), re.IGNORECASE): # ignores capital cases. TODO: need a more extensive gating  
-                break
-            
-            else:
-                text += reader.pages[page_num].extract_text() + "\n\n"
-            
-        return text
+        result = text_cache.get(url) # seen this arXiv id + version => no download / parsing
+        if result is None:
+            result = extract_pdf(url)
+            text_cache.put(url, result)
+        return result.text
 
     except Exception as e:
         print("Bad URL")
 
-def simple_summary(content: str) -> str:
+async def _complete(system_prompt: str, content: str, max_tokens: int, deadline: float) -> Optional[str]:
     """
-    Takes in PDF message and returns a simple summarized paragraph of the paper
+    One chat completion, memoized on (content, system prompt, model)
     """
+    key = summary_key(content, system_prompt, MODEL)
+    cached = summary_cache.get(key) # same text + prompt + model => no LLM call
+    if cached is not None:
+        return cached.decode('utf-8')
 
-    safe_decode = content.encode('utf-8', 'ignore').decode('utf-8')
-
-    if not safe_decode:
-        logger.info("No content")
-        return None 
-    
     data = {
-        "model": "openai/gpt-3.5-turbo",
+        "model": MODEL,
         "messages": [{
             "role": "system", 
-            "content": "You are a helpful assistant that explains high level technical reports in layman terms." # dont need to line break inside a list 
-                        "Ensure the output has 2 paragraphs, the first paragraph is a layman abstraction."
-                        "THe second paragraph can be longer that contains the methodology and results. Also include explaining the methodology in simple terms." 
-                        "Do not include formatting such as **<Abstract>** / **<Methodology>**. "
+            "content": system_prompt
             }, # set role of assistant 
             {
                 "role": "user",
-                "content": safe_decode 
+                "content": content 
             }
         ],
-        "max_tokens": 2048
+        "max_tokens": max_tokens
     }
-    response = requests.post(OR_ENDPOINT, headers=headers, json=data)
+    response = await dispatcher.complete(data, deadline)
+
+    summary = response["choices"][0]["message"]["content"]
+    if summary:
+        summary_cache.set(key, summary.encode('utf-8'))
+    return summary
+
+async def map_reduce_summary(content: str) -> Optional[str]:
+    """
+    Long papers => section aware chunks summarized concurrently, then reduced to the 2 paragraph summary.
+
+    Chunks are kept (key sections first) while the estimated spend of map + reduce calls fits
+    SUMMARY_TOKEN_BUDGET. Chunk calls still running at the map deadline are dropped, the reduce
+    call gets whatever time is left of SUMMARY_DEADLINE
+    """
+    started = time.monotonic()
+    map_overhead = count_tokens(MAP_PROMPT) + MESSAGE_OVERHEAD + 2 * MAP_MAX_TOKENS # chunk summary is paid again as reduce input
+    reduce_cost = count_tokens(SYSTEM_PROMPT) + MESSAGE_OVERHEAD + MAX_SUMMARY_TOKENS
+
+    chunks = chunk_text(content, SUMMARY_CHUNK_TOKENS)
+    selected = select_chunks(chunks, SUMMARY_TOKEN_BUDGET - reduce_cost, map_overhead)
+    if not selected:
+        return None
+
+    map_deadline = SUMMARY_DEADLINE * MAP_DEADLINE_SHARE
+    tasks = [asyncio.create_task(_complete(MAP_PROMPT, chunk.text, MAP_MAX_TOKENS, map_deadline)) for chunk in selected]
+    _, pending = await asyncio.wait(tasks, timeout=map_deadline)
+    for task in pending:
+        task.cancel()
+
+    notes = []
+    for chunk, task in zip(selected, tasks):
+        if task in pending:
+            continue
+        if task.exception() is not None:
+            logger.warning(f"chunk '{chunk.heading}' failed: {task.exception()}")
+            continue
+        if task.result():
+            notes.append(f"{chunk.heading or 'Opening'}:\n{task.result()}")
+
+    if not notes:
+        return None
 
-    return response.json()["choices"][0]["message"]["content"]
+    spent = sum(chunk.tokens for chunk in selected) + map_overhead * len(selected) + reduce_cost
+    logger.info(f"map-reduce over {len(notes)}/{len(selected)} chunks ({len(chunks)} total), ~{spent} tokens")
+
+    remaining = max(1.0, SUMMARY_DEADLINE - (time.monotonic() - started))
+    return await _complete(SYSTEM_PROMPT, "\n\n".join(notes), MAX_SUMMARY_TOKENS, remaining)
+
+async def summarize(content: str) -> Optional[str]:
+    """
+    Layman summary of one paper's text.
+
+    Text that fits the context window and token budget goes out in one request, longer text is map-reduced
+    """
+    safe_decode = content.encode('utf-8', 'ignore').decode('utf-8')
+
+    if not safe_decode:
+        logger.info("No content")
+        return None 
+
+    single_pass = min(CONTEXT_TOKENS, SUMMARY_TOKEN_BUDGET) - MAX_SUMMARY_TOKENS - count_tokens(SYSTEM_PROMPT) - MESSAGE_OVERHEAD
+    if count_tokens(safe_decode) <= single_pass:
+        return await _complete(SYSTEM_PROMPT, safe_decode, MAX_SUMMARY_TOKENS, min(LLM_DEADLINE, SUMMARY_DEADLINE))
+
+    return await map_reduce_summary(safe_decode)
+
+def simple_summary(content: str) -> str:
+    """
+    Takes in PDF message and returns a simple summarized paragraph of the paper
+
+    Blocking wrapper around summarize for scripts, async callers await summarize directly
+    """
+    async def summarize_once() -> Optional[str]:
+        try:
+            return await summarize(content)
+        finally:
+            await dispatcher.aclose() # the loop ends with asyncio.run => so does its http client
+
+    return asyncio.run(summarize_once())
 
 if __name__ == "__main__":
     from app.database.connection import get_db
@@ -93,3 +181,5 @@ if __name__ == "__main__":
                 logger.info(f"Successfully updated summary for: {paper.title}")
 
         db.commit()
+
+    logger.info(f"summary cache hits: {summary_cache.hits}, misses: {summary_cache.misses}")
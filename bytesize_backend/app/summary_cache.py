@@ -0,0 +1,27 @@
+"""Persistent memo of LLM summaries keyed on (normalized input text, system prompt, model)"""
+
+import re
+import json
+import hashlib
+import unicodedata
+from app.config import SUMMARY_CACHE_PATH, SUMMARY_CACHE_TTL, SUMMARY_CACHE_SIZE, SUMMARY_CACHE_DISK_SIZE
+from app.api.query_cache import TTLCache
+
+def normalize(content: str) -> str:
+    """
+    Text that only differs in unicode form / whitespace (re-extraction, new PyPDF2 version) => same key
+    """
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', content)).strip()
+
+def summary_key(content: str, system_prompt: str, model: str) -> str:
+    """
+    A new prompt or model is a new key, so old summaries are never served for a changed request
+    """
+    payload = json.dumps([normalize(content), system_prompt, model])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def hit_rate() -> float:
+    lookups = summary_cache.hits + summary_cache.misses
+    return summary_cache.hits / lookups if lookups else 0.0
+
+summary_cache = TTLCache(SUMMARY_CACHE_SIZE, SUMMARY_CACHE_TTL, SUMMARY_CACHE_PATH, SUMMARY_CACHE_DISK_SIZE)
@@ -0,0 +1,112 @@
+"""On-disk, gzip compressed cache of extracted paper text keyed by arXiv id + version"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from dataclasses import asdict
+from typing import Optional
+from logger import setup_logging
+from app.config import TEXT_CACHE_DIR, TEXT_CACHE_MAX_BYTES
+from app.extraction import ExtractionResult
+from app.api.atom import arxiv_id
+
+logger = setup_logging()
+
+def cache_key(url: str) -> str:
+    """
+    http://arxiv.org/abs/2502.12345v2 => 2502.12345v2, cs/0112017v1 => cs_0112017v1
+
+    A new version is a new key, non arXiv links fall back to a hash of the url
+    """
+    paper_id = arxiv_id(url, keep_version=True)
+    if paper_id:
+        return paper_id.replace('/', '_')
+    return hashlib.sha256(url.encode()).hexdigest()
+
+class TextCache:
+    """
+    One <key>.json.gz file per paper. Hits refresh the file mtime and the oldest files are
+    evicted once the directory grows past max_bytes
+    """
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None # lazily scanned
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, cache_key(url) + ".json.gz")
+
+    def get(self, url: str) -> Optional[ExtractionResult]:
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                result = ExtractionResult(**json.load(f))
+            os.utime(path) # LRU by mtime
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, TypeError) as e: # corrupt / old format => drop it
+            logger.warning(f" dropping unreadable cache entry {path}: {e}")
+            self._discard(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return result
+
+    def put(self, url: str, result: ExtractionResult) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(asdict(result), f)
+        size = os.path.getsize(tmp)
+
+        with self._lock:
+            self._scan()
+            if os.path.exists(path):
+                self._size -= os.path.getsize(path)
+            os.replace(tmp, path) # atomic => readers never see half a file
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _discard(self, path: str) -> None:
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                return
+            if self._size is not None:
+                self._size -= size
+
+    def _scan(self) -> None:
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json.gz")]
+
+    def _evict(self) -> None:
+        """
+        Oldest (least recently read / written) first, down to 90% of max_bytes
+        """
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for entry in sorted(self._entries(), key=lambda entry: entry.stat().st_mtime):
+            if self._size <= target:
+                break
+            size = entry.stat().st_size
+            os.remove(entry.path)
+            self._size -= size
+            evicted += 1
+        logger.info(f" text cache evicted {evicted} entries, now {self._size / 1e6:.1f}MB")
+
+text_cache = TextCache(TEXT_CACHE_DIR, TEXT_CACHE_MAX_BYTES)
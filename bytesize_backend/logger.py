@@ -1,6 +1,55 @@
+import os
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO") # DEBUG, INFO, WARNING, ERROR, CRITICAL
+LOG_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+
+_listener = None
+_configured = False
+
+def _configure() -> None:
+    """
+    Once per process: callers only enqueue records, a background thread formats and writes them
+    => a slow / blocked stderr never stalls the event loop or a worker thread
+    """
+    global _listener, _configured
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    _listener = QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop) # drains what is still queued
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(records))
+    root.setLevel(LOG_LEVEL)
+    _configured = True
+
+def setup_worker_logging() -> None:
+    """
+    Process pool initializer => plain stderr handler, no queue + listener thread per short lived worker
+    """
+    global _listener, _configured
+    root = logging.getLogger()
+    if _listener is not None: # importing the worker function already ran _configure()
+        atexit.unregister(_listener.stop)
+        _listener.stop()
+        for handler in [handler for handler in root.handlers if isinstance(handler, QueueHandler)]:
+            root.removeHandler(handler)
+        _listener = None
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    _configured = True
 
 def setup_logging():
-    logging.basicConfig(level=logging.INFO) # DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    if not _configured:
+        _configure()
     logger = logging.getLogger(__name__)
-    return logger
\ No newline at end of file
+    return logger
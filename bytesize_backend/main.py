@@ -1,25 +1,49 @@
 import os 
 import asyncio
 import uvicorn
-from typing import List, Dict
+from functools import partial
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional
 from logger import setup_logging
-from app.database.paper import Paper
-from fastapi import FastAPI, Depends
-from app.database.crud import get_papers
+from app.database.paper import PREVIEW_CHARS
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from app.database import async_crud
+from app.database.crud import parse_fields, PAPER_FIELDS
 from contextlib import asynccontextmanager
 from app.scheduler import scheduled_scraper
-from fastapi.staticfiles import StaticFiles
+from app.extraction import shutdown_pool
+from app.search_index import title_index, author_index, load_indexes
+from app.snapshot import feed_snapshots, snapshot_response
+from app.federated_search import federated_search, SourceSkipped
+from app.config import SEARCH_DEADLINE, SEARCH_ARXIV_HEAD_START, EXPORT_MAX_CONCURRENT, ARXIV_SEARCH_MAX_WAIT
+from app.serialization import encode_feed, encode_ndjson, encode_csv, paper_rows, dumps, json_response
+from app.static_files import PrecompressedStaticFiles
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database.connection import get_db, Session # check db connection upon startup 
-from app.api.search_arxiv import search_papers, fuzzy_match_papers
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.connection import get_db, get_async_db, async_engine, AsyncSessionLocal # check db connection upon startup 
+from app.api.search_arxiv import search_papers, fuzzy_match_papers, search_executor
+from app.api.query_cache import RateLimited
 
 logger = setup_logging()
 
+MAX_PAGE_SIZE = 200
+MAX_SEARCH_RESULTS = 50
+
+def _load_search_index():
+    try:
+        with next(get_db()) as db:
+            load_indexes(db)
+    except Exception as e:
+        logger.error(f"search index load failed, falling back to db search: {e}") 
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     On startup, run the scheduler 
     """
+    await asyncio.to_thread(_load_search_index)
+
     logger.info("starting daily scraping")
     task = asyncio.create_task(scheduled_scraper())
     
@@ -30,6 +54,9 @@ async def lifespan(app: FastAPI):
         await task
     except asyncio.CancelledError:
         logger.info("scraping cancelled successfully")
+    shutdown_pool()
+    search_executor.shutdown(wait=False, cancel_futures=True)
+    await async_engine.dispose()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -39,118 +66,167 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  
     allow_headers=["*"], 
+    expose_headers=["X-Search-Sources"],
 )
 
 from fastapi import APIRouter
 api_router = APIRouter(prefix="/api")
 
+def fields_param(fields: Optional[str] = Query(None, description="comma separated projection e.g. id,title,authors")) -> List[str]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def export_fields_param(fields: Optional[str] = Query(None, description="comma separated projection, default every field")) -> List[str]:
+    try:
+        return parse_fields(fields, default=PAPER_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @api_router.get("/papers/{cite}")
-async def get_papers_endpoint(cite: bool = False, db: Session=Depends(get_db)) -> List[Dict]: # TODO: Add pagination returns 
+async def get_papers_endpoint(
+        request: Request, cite: bool = False, limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE), 
+        cursor: Optional[str] = None, fields: List[str] = Depends(fields_param), 
+        db: AsyncSession=Depends(get_async_db)
+        ) -> Response: 
     """
     Recent papers have 0 citation
 
     If not cited: then return recent papers   
+
+    Paginated => pass back `next_cursor` as `cursor` to get the following page, None on the last page 
+
+    Pages are served from pre-serialized gzip snapshots with an ETag => revalidation gets a 304 
     """
-    res = []
-    papers = get_papers(db, cite=cite)
-
-    for paper in papers: 
-        res.append({
-            "id": paper.id,
-            "title": paper.title,
-            "authors": paper.authors,
-            "published": paper.published,
-            "summary": paper.summary,
-            "layman_summary": paper.layman_summary,
-            "link": paper.link,
-            "categories": paper.categories,
-            "citations": paper.citations
-        })
-    return res
+    key = (cite, limit, cursor, tuple(fields))
+    snapshot = feed_snapshots.get(key)
+
+    if snapshot is None: # miss => query once, every later hit is served from memory
+        generation = feed_snapshots.generation
+        try:
+            papers, next_cursor = await async_crud.get_papers_page(db, limit=limit, cursor=cursor, cite=cite, fields=fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        snapshot = feed_snapshots.put(key, encode_feed(papers, next_cursor, fields), generation)
+
+    return snapshot_response(snapshot, request)
+
+@api_router.get("/paper/{paper_id}")
+async def get_paper_endpoint(paper_id: int, db: AsyncSession=Depends(get_async_db)) -> Response:
+    """
+    Full paper including the heavy summary / layman_summary text
+    """
+    paper = await async_crud.get_paper(db, paper_id)
+    if paper is None:
+        raise HTTPException(status_code=404, detail="paper not found")
+    return json_response(dumps(paper_rows([paper])[0]))
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+export_slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENT) # exports beyond this get a 429, not the api pool's last connections
+
+async def export_stream(export_format: str, fields: List[str], db: AsyncSession, batches: AsyncIterator, first) -> AsyncIterator[bytes]:
+    """
+    Owns the session and the export slot => both live as long as the response body, not the request handler
+    """
+    encode = encode_ndjson if export_format == "ndjson" else encode_csv
+    try:
+        if export_format == "csv":
+            yield encode_csv([], fields, header=True)
+        if first is not None:
+            yield encode(first, fields)
+            async for batch in batches:
+                yield encode(batch, fields)
+    finally:
+        await batches.aclose()
+        await db.close()
+        export_slots.release()
+
+@api_router.get("/export")
+async def export_endpoint(
+        format: str = Query("ndjson", pattern="^(ndjson|csv)$"), after_id: Optional[int] = None,
+        since: Optional[datetime] = None, fields: List[str] = Depends(export_fields_param)
+        ) -> StreamingResponse:
+    """
+    Whole corpus (cited + recent, with summaries) as NDJSON or CSV, streamed from a server side cursor
+
+    Rows come in id order, or (published, id) order when `since` is given. id / published are always
+    exported so an interrupted download resumes with ?after_id=<last id> or ?since=<last published>&after_id=<last id>
+
+    The first batch is fetched before the response starts => a failing query is an error status, not a cut off 200
+    """
+    if since is not None and since.tzinfo is not None: # published is stored as naive UTC
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    fields = list(dict.fromkeys(["id", "published", *fields])) # watermark columns first
+
+    if export_slots.locked():
+        raise HTTPException(status_code=429, detail="too many exports running, retry later")
+    await export_slots.acquire()
+    db = AsyncSessionLocal()
+    try:
+        batches = async_crud.export_batches(db, fields, after_id=after_id, since=since)
+        first = await anext(batches, None)
+    except BaseException:
+        await db.close()
+        export_slots.release()
+        raise
+
+    return StreamingResponse(
+        export_stream(format, fields, db, batches, first),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="papers.{format}"'}
+    )
 
 @api_router.get("/search/{option}/{query}")
-async def search_papers_endpoint(option: str, query: str, max_results: int = 10, db: Session=Depends(get_db)) -> List[Dict]:
+async def search_papers_endpoint(
+        option: str, query: str, max_results: int = Query(10, ge=1, le=MAX_SEARCH_RESULTS),
+        fields: List[str] = Depends(fields_param), db: AsyncSession=Depends(get_async_db)
+        ) -> Response:
     """
     Performs manual search based on option (title / author)
 
-    Query is matched based on exact, followed by fuzzy 
+    The local db is searched first, arXiv only when local comes back short of max_results or is still running
+    after SEARCH_ARXIV_HEAD_START. Results are merged (local first) within SEARCH_DEADLINE and deduped by arXiv id.
+    X-Search-Sources reports each source as ok / timeout / error / skipped
     """
-
-    results = []
-    seen_url = set() 
     is_partial_query = len(query.split()) < 2 or len(query) < 10 # heuristic for short search 
-    
-    # local db search first 
-    local_papers = []
-    
-    try:
-        if option == "title":
-            if is_partial_query:
-                local_papers = db.query(Paper).filter(
-                    Paper.title.ilike(f"%{query}%") # ilike => case insensitive
-                ).limit(max_results).all()
-            else:
-                local_papers = db.query(Paper).filter(
-                    Paper.title.ilike(f"%{query}%")
-                ).limit(max_results).all()
+    columns = list(dict.fromkeys([*fields, "link"])) # link => dedupe key, dropped again unless requested
+
+    async def local_search(remaining: float) -> List[Dict]:
+        index = title_index if option == "title" else author_index
+        if is_partial_query and index.ready: # in-memory trigram index => no db scan for keystroke searches
+            titles = [title for title, _ in index.search(query, limit=max_results)]
+            local_papers = await async_crud.get_papers_by_titles(db, titles, fields=fields)
+        elif option == "title":
+            local_papers = await async_crud.search_titles(db, query, limit=max_results, fields=fields)
         else:  
-            if is_partial_query:
-                local_papers = db.query(Paper).filter(
-                    Paper.authors.any(lambda x: x.ilike(f"%{query}%"))
-                ).limit(max_results).all()
-            else:
-                local_papers = db.query(Paper).filter(
-                    Paper.authors.any(lambda x: x.ilike(f"%{query}%"))
-                ).limit(max_results).all()
-    except Exception as e:
-        logger.error(" local database search fail")
-    
-    # add local results 
-    for paper in local_papers:
-        seen_url.add(paper.link) # add to seen set 
-        results.append({
-            "id": paper.id,
-            "title": paper.title,
-            "authors": paper.authors,
-            "published": paper.published,
-            "summary": paper.summary,
-            "layman_summary": paper.layman_summary,
-            "link": paper.link,
-            "categories": paper.categories,
-            "citations": paper.citations
-        })
-
-    # if enuf results 
-    if len(results) >= max_results:
-        return results[:max_results]
-    
-    # arxiv search 
-    try:
-        remaining_results = max_results - len(results)
-        
-        arxiv_results = []
+            local_papers = await async_crud.search_authors(db, query, limit=max_results, fields=fields)
+        return paper_rows(local_papers, columns)
+
+    async def arxiv_search(remaining: float) -> List[Dict]:
+        # own bounded executor => waiting on arXiv never blocks the event loop or the default executor.
+        # No limiter slot within the time left => skipped instead of a call nobody waits for
+        limits = {"max_wait": min(ARXIV_SEARCH_MAX_WAIT, remaining), "deadline": remaining}
         if is_partial_query:
-            arxiv_results = fuzzy_match_papers(query, remaining_results)
+            call = partial(fuzzy_match_papers, query, max_results, **limits)
         else:
-            arxiv_results = search_papers(query, search_type=option, max_results=remaining_results)
-        
-        # Add arXiv results
-        if arxiv_results:
-            for paper in arxiv_results:
-                if not paper["link"] in seen_url: # if title already from local db, skip
-                    continue
-
-                paper["layman_summary"] = None
-                paper["id"] = None
-                results.append(paper)
-
-                if len(results) >= max_results:
-                    break
-
-    except Exception as e:
-        logger.error("arXiv search fail")
-    
-    return results[:max_results]
+            call = partial(search_papers, query, search_type=option, max_results=max_results, **limits)
+        try:
+            arxiv_results = await asyncio.get_running_loop().run_in_executor(search_executor, call)
+        except RateLimited as e:
+            raise SourceSkipped(str(e)) from e
+        return [ # not stored
+            {**paper, "id": None, "layman_summary": None, "preview": (paper.get("summary") or "")[:PREVIEW_CHARS]}
+            for paper in arxiv_results or []
+        ]
+
+    result = await federated_search(
+        {"local": local_search, "arxiv": arxiv_search}, max_results=max_results, deadline=SEARCH_DEADLINE,
+        head_start={"arxiv": SEARCH_ARXIV_HEAD_START}
+    )
+    papers = [{field: paper.get(field) for field in fields} for paper in result.papers]
+    return json_response(dumps(papers), headers={"X-Search-Sources": result.sources_header()})
 
 @api_router.get("/ping")
 async def ping():
@@ -160,7 +236,7 @@ app.include_router(api_router)
 
 frontend_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "out")
 if os.path.exists(frontend_path):
-    app.mount("/", StaticFiles(directory=frontend_path, html=True), name="frontend")
+    app.mount("/", PrecompressedStaticFiles(directory=frontend_path, html=True), name="frontend")
 else:
     print("Frontend build directory not")
 
@@ -0,0 +1,106 @@
+"""Parse time / peak memory of app.api.atom.iter_entries vs the old ET.fromstring + './/' parsing
+
+python -m tests.bench_atom_parser                     # synthetic arXiv shaped feeds of 100 / 1000 / 5000 entries
+python -m tests.bench_atom_parser feed1.xml feed2.xml # recorded feeds, e.g. curl "http://export.arxiv.org/api/query?search_query=cat:cs.LG&max_results=2000" > feed1.xml
+"""
+
+import re
+import sys
+import time
+import random
+import tracemalloc
+import xml.etree.ElementTree as ET
+from app.api.atom import iter_entries
+
+ENTRY_TEMPLATE = """  <entry>
+    <id>http://arxiv.org/abs/2502.{n:05d}v1</id>
+    <updated>2025-02-20T18:59:59Z</updated>
+    <published>2025-02-20T18:59:59Z</published>
+    <title>{title}</title>
+    <summary>  {summary}
+</summary>
+{authors}
+    <arxiv:comment xmlns:arxiv="http://arxiv.org/schemas/atom">12 pages, 4 figures</arxiv:comment>
+    <link href="http://arxiv.org/abs/2502.{n:05d}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2502.{n:05d}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+"""
+
+WORDS = "learning model neural network attention diffusion language graph agents scaling retrieval vision reinforcement".split()
+
+def synthetic_feed(entries: int) -> bytes:
+    random.seed(entries)
+    body = []
+    for n in range(entries):
+        body.append(ENTRY_TEMPLATE.format(
+            n=n,
+            title=" ".join(random.choices(WORDS, k=10)).title(),
+            summary="\n".join(" ".join(random.choices(WORDS, k=12)) for _ in range(15)),
+            authors="\n".join(f"    <author>\n      <name>Author {n}-{i}</name>\n    </author>" for i in range(random.randint(1, 12)))
+        ))
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        '  <title type="html">ArXiv Query</title>\n'
+        + "".join(body) +
+        '</feed>\n'
+    ).encode()
+
+def legacy_parse(content: bytes) -> list:
+    """
+    Parsing as done before iter_entries (arxiv_format / fuzzy_match_papers / search_arxiv_by_title)
+    """
+    root = ET.fromstring(content)
+    papers = []
+    for entry in root.findall('.//{http://www.w3.org/2005/Atom}entry'):
+        papers.append({
+            'title': entry.find('.//{http://www.w3.org/2005/Atom}title').text.strip(),
+            'authors': [author.find('.//{http://www.w3.org/2005/Atom}name').text
+                    for author in entry.findall('.//{http://www.w3.org/2005/Atom}author')],
+            'published': entry.find('.//{http://www.w3.org/2005/Atom}published').text,
+            'summary': re.sub(r'\n', ' ', entry.find('.//{http://www.w3.org/2005/Atom}summary').text.strip()),
+            'link': entry.find('.//{http://www.w3.org/2005/Atom}id').text,
+            'categories': [cat.get('term') for cat in entry.findall('.//{http://www.w3.org/2005/Atom}category')]
+        })
+    return papers
+
+def measure(parse, content: bytes, repeat: int = 3):
+    """
+    Best wall time of `repeat` runs + tracemalloc peak of one run. Records are consumed one at a time
+    like the callers do, so the streaming parser never holds more than one
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in parse(content))
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    for _ in parse(content):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, best, peak
+
+def main():
+    if len(sys.argv) > 1:
+        feeds = [(path, open(path, "rb").read()) for path in sys.argv[1:]]
+    else:
+        feeds = [(f"synthetic {n}", synthetic_feed(n)) for n in (100, 1000, 5000)]
+
+    print(f"{'feed':<20}{'size':>10}{'entries':>9}{'legacy ms':>12}{'stream ms':>12}{'legacy peak':>14}{'stream peak':>14}")
+    for name, content in feeds:
+        assert legacy_parse(content) == list(iter_entries(content)), f"parsers disagree on {name}"
+        count, legacy_time, legacy_peak = measure(legacy_parse, content)
+        _, stream_time, stream_peak = measure(iter_entries, content)
+        print(
+            f"{name:<20}{len(content) / 1e6:>8.1f}MB{count:>9}"
+            f"{legacy_time * 1e3:>12.1f}{stream_time * 1e3:>12.1f}"
+            f"{legacy_peak / 1e6:>12.1f}MB{stream_peak / 1e6:>12.1f}MB"
+        )
+
+if __name__ == "__main__":
+    main()
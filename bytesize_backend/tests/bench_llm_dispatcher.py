@@ -0,0 +1,100 @@
+"""Summary throughput of serial blocking calls vs the async LLMDispatcher against a local mock endpoint
+
+python -m tests.bench_llm_dispatcher                          # 200 requests, 250ms latency, 40 req/s provider limit
+python -m tests.bench_llm_dispatcher --requests 500 --rps 100 --latency 0.5
+
+The mock answers every chat completion after --latency seconds and enforces --rps with a fixed one second
+window, answering 429 + Retry-After + x-ratelimit-* headers like OpenAI / OpenRouter once it is used up
+"""
+
+import time
+import asyncio
+import argparse
+import threading
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from app.api import http_client
+from app.api.llm_dispatcher import LLMDispatcher
+
+PORT = 8765
+ENDPOINT = f"http://127.0.0.1:{PORT}/v1/chat/completions"
+REQUEST = {"model": "mock", "messages": [{"role": "user", "content": "paper text"}], "max_tokens": 16}
+
+def mock_provider(latency: float, rps: int) -> FastAPI:
+    app = FastAPI()
+    window = {"start": time.monotonic(), "count": 0}
+    app.state.throttled = 0
+
+    @app.post("/v1/chat/completions")
+    async def completions():
+        now = time.monotonic()
+        if now - window["start"] >= 1:
+            window["start"], window["count"] = now, 0
+        window["count"] += 1
+        reset = max(0.0, 1 - (now - window["start"]))
+        if window["count"] > rps:
+            app.state.throttled += 1
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={
+                "Retry-After": f"{reset:.3f}",
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": f"{reset:.3f}s",
+            })
+
+        await asyncio.sleep(latency)
+        return JSONResponse({"choices": [{"message": {"content": "summary"}}]}, headers={
+            "x-ratelimit-remaining-requests": str(max(0, rps - window["count"])),
+            "x-ratelimit-reset-requests": f"{reset:.3f}s",
+        })
+
+    return app
+
+def serve(app: FastAPI) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+def serial(requests: int) -> None:
+    """
+    The pipeline before the dispatcher => one blocking requests.post after another
+    """
+    for _ in range(requests):
+        http_client.post(ENDPOINT, json=REQUEST, deadline=120).raise_for_status()
+
+async def dispatched(requests: int, max_in_flight: int) -> LLMDispatcher:
+    dispatcher = LLMDispatcher(ENDPOINT, {}, max_in_flight=max_in_flight, retries=20)
+    await asyncio.gather(*(dispatcher.complete(REQUEST, deadline=120) for _ in range(requests)))
+    await dispatcher.aclose()
+    return dispatcher
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.25, help="seconds per completion")
+    parser.add_argument("--rps", type=int, default=40, help="provider request limit per second")
+    args = parser.parse_args()
+
+    app = mock_provider(args.latency, args.rps)
+    server = serve(app)
+
+    print(f"{'mode':<16}{'seconds':>9}{'req/s':>8}{'429s':>7}{'final limit':>13}")
+    serial_requests = min(args.requests, 40) # bounded, it is the slow baseline
+    start = time.perf_counter()
+    serial(serial_requests)
+    elapsed = time.perf_counter() - start
+    print(f"{'serial':<16}{elapsed:>9.2f}{serial_requests / elapsed:>8.1f}{0:>7}{'-':>13}")
+
+    for max_in_flight in (1, 8, 32, 128):
+        app.state.throttled = 0
+        start = time.perf_counter()
+        dispatcher = asyncio.run(dispatched(args.requests, max_in_flight))
+        elapsed = time.perf_counter() - start
+        print(f"{f'in flight {max_in_flight}':<16}{elapsed:>9.2f}{args.requests / elapsed:>8.1f}"
+              f"{app.state.throttled:>7}{dispatcher.limit:>13}")
+
+    server.should_exit = True
+
+if __name__ == "__main__":
+    main()
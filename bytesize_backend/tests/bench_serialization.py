@@ -0,0 +1,85 @@
+"""Serialization time per 1,000 papers: the old dict + jsonable_encoder path vs app/serialization.py
+
+python -m tests.bench_serialization                   # 1,000 papers, every field, ~1.5k char summaries
+python -m tests.bench_serialization --papers 5000 --fields id,title,authors,published,link,categories,citations
+
+No database needed, papers are built in memory as ORM instances and as Row-like tuples
+"""
+
+import json
+import time
+import random
+import argparse
+from collections import namedtuple
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from app.database.paper import Paper
+from app.database.crud import PAPER_FIELDS, parse_fields
+from app.serialization import encode_feed
+
+WORDS = "attention transformer language model graph neural network diffusion agent reasoning benchmark".split()
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def make_papers(count: int) -> list:
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    return [
+        Paper(
+            id=i,
+            title=sentence(rng, 10),
+            authors=[sentence(rng, 2) for _ in range(rng.randint(1, 8))],
+            published=now - timedelta(minutes=i),
+            summary=sentence(rng, 200),
+            layman_summary=sentence(rng, 120),
+            link=f"http://arxiv.org/abs/2501.{i:05d}v1",
+            categories=["cs.LG", "cs.CL"],
+            citations=rng.choice([0, 0, 0, 12, 3400]),
+        )
+        for i in range(count)
+    ]
+
+def old_path(papers: list, fields: list) -> bytes:
+    """
+    main.py before => dict per paper, jsonable_encoder, then json.dumps
+    """
+    payload = {"papers": [{field: getattr(paper, field) for field in fields} for paper in papers], "next_cursor": None}
+    return json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--papers", type=int, default=1000)
+    parser.add_argument("--fields", default=None, help="comma separated projection, default every field")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fields = parse_fields(args.fields, default=PAPER_FIELDS)
+    papers = make_papers(args.papers)
+    Row = namedtuple("Row", PAPER_FIELDS) # attribute + positional access, like a sqlalchemy Row
+    rows = [Row(*(getattr(paper, field) for field in PAPER_FIELDS)) for paper in papers]
+
+    assert json.loads(old_path(papers, fields)) == json.loads(encode_feed(papers, None, fields))
+
+    per_1000 = 1000 / args.papers
+    print(f"{args.papers} papers, fields: {','.join(fields)}, {len(old_path(papers, fields)) / args.papers:.0f} bytes/paper")
+    print(f"{'path':<34}{'ms / 1000 papers':>18}{'speedup':>9}")
+    results = [(label, timed(fn, args.repeat)) for label, fn in [
+        ("dict + jsonable_encoder + json", lambda: old_path(papers, fields)),
+        ("orjson, ORM rows", lambda: encode_feed(papers, None, fields)),
+        ("orjson, result tuples", lambda: encode_feed(rows, None, fields)),
+    ]]
+    baseline = results[0][1]
+    for label, elapsed in results:
+        print(f"{label:<34}{elapsed * 1000 * per_1000:>18.2f}{baseline / elapsed:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""EXPLAIN plans of the hot queries in app/database/crud.py / main.py
+
+python -m tests.explain_queries                # EXPLAIN of every statement the crud calls issue
+python -m tests.explain_queries --analyze      # EXPLAIN (ANALYZE, BUFFERS), inside a transaction that is rolled back
+python -m tests.explain_queries --no-seqscan   # discourage seq scans => shows whether an index can serve each query on a small dev db
+
+Statements are captured while calling the crud functions themselves, so the plans follow the code.
+Anything still planned as a Seq Scan on "Papers" is flagged
+"""
+
+import sys
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database.connection import engine
+from app.database.crud import (
+    get_papers_page, get_paper, search_titles, search_authors, get_papers_by_titles,
+    existing_links, latest_published, delete_paper, encode_cursor
+)
+from app.database.paper import Paper
+
+FEED_FIELDS = ["id", "title", "authors", "published", "link", "categories", "citations"]
+
+def hot_queries(db: Session, sample: Paper):
+    """
+    label => call, mirrors what the endpoints / ingest do per request
+    """
+    recent_cursor = encode_cursor(sample, cite=False)
+    cited_cursor = encode_cursor(Paper(id=sample.id, citations=max(sample.citations or 0, 1)), cite=True)
+    return [
+        ("GET /api/papers/false (first page)", lambda: get_papers_page(db, 50, fields=FEED_FIELDS)),
+        ("GET /api/papers/false?cursor=", lambda: get_papers_page(db, 50, recent_cursor, fields=FEED_FIELDS)),
+        ("GET /api/papers/true (first page)", lambda: get_papers_page(db, 50, cite=True, fields=FEED_FIELDS)),
+        ("GET /api/papers/true?cursor=", lambda: get_papers_page(db, 50, cited_cursor, cite=True, fields=FEED_FIELDS)),
+        ("GET /api/paper/{id}", lambda: get_paper(db, sample.id)),
+        ("GET /api/search/title (full text)", lambda: search_titles(db, "attention is all you need", 10)),
+        ("GET /api/search/title (trigram)", lambda: search_titles(db, "transfomer", 10)),
+        ("GET /api/search/title (index hits)", lambda: get_papers_by_titles(db, [sample.title])),
+        ("GET /api/search/author", lambda: search_authors(db, "smith", 10)),
+        ("ingest: existing_links", lambda: existing_links(db, [sample.link, "http://arxiv.org/abs/0000.00000v1"])),
+        ("scheduler: latest_published", lambda: latest_published(db)),
+        ("scheduler: retention delete", lambda: delete_paper(db)),
+    ]
+
+def capture(fn) -> list:
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return statements
+
+def main():
+    analyze = "--analyze" in sys.argv
+    explain = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+
+    with engine.connect() as conn:
+        outer = conn.begin() # everything below (incl. the retention delete) is rolled back
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        if "--no-seqscan" in sys.argv:
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        sample = db.query(Paper).order_by(Paper.published.desc()).first() or Paper(
+            id=1, title="", link="", published=datetime.utcnow(), citations=0
+        )
+        flagged = []
+        for label, call in hot_queries(db, sample):
+            for statement, parameters in capture(call):
+                if statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+                    continue
+                plan = [row[0] for row in conn.exec_driver_sql(explain + statement, parameters)]
+                print(f"\n=== {label}\n{' '.join(statement.split())[:300]}")
+                print("\n".join(f"    {line}" for line in plan))
+                if any('Seq Scan on "Papers"' in line for line in plan):
+                    flagged.append(label)
+
+        db.close()
+        outer.rollback()
+
+    print("\nseq scans on Papers:", ", ".join(dict.fromkeys(flagged)) or "none")
+
+if __name__ == "__main__":
+    main()
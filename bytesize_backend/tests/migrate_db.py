@@ -1,15 +1,21 @@
 import os
+import sys
 from dotenv import load_dotenv
-from sqlalchemy.sql import text
 from logger import setup_logging
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, text
+from app.database.migrations import MIGRATIONS, migrate
 
 load_dotenv()
 
 logger = setup_logging()
 
 def migrate_database():
+    """
+    Applies pending migrations from app/database/migrations.py, safe to re-run
 
+    python -m tests.migrate_db            # apply
+    python -m tests.migrate_db --status   # list applied / pending versions
+    """
     load_dotenv()
     database_url = os.getenv("SUPABASE_DATABASE_URL")
     
@@ -17,74 +23,22 @@ def migrate_database():
         return
     
     engine = create_engine(database_url)
-    metadata = MetaData()
-    
-    with engine.connect() as conn:
-        transaction = conn.begin()
-        try:
-
-            result = conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name='papers' AND column_name='id'
-            """))
-            
-            if result.fetchone() is None:
-                conn.execute(text("""
-                    ALTER TABLE "Papers" 
-                    ADD COLUMN id INTEGER
-                """))
 
-                logger.info("Assigning IDs to cited papers")
-                conn.execute(text("""
-                    WITH cited_papers AS (
-                        SELECT title, ROW_NUMBER() OVER (ORDER BY published DESC) as row_num
-                        FROM "Papers"
-                        WHERE citations > 0
-                    )
-                    UPDATE "Papers" p
-                    SET id = cp.row_num
-                    FROM cited_papers cp
-                    WHERE p.title = cp.title
-                """))
-                
-                logger.info("Assigning IDs to non-cited papers")
-                conn.execute(text("""
-                    WITH non_cited_papers AS (
-                        SELECT title, ROW_NUMBER() OVER (ORDER BY published DESC) as row_num
-                        FROM "Papers"
-                        WHERE citations = 0 OR citations IS NULL
-                    )
-                    UPDATE "Papers" p
-                    SET id = ncp.row_num
-                    FROM non_cited_papers ncp
-                    WHERE p.title = ncp.title
-                """))
-                
-                conn.execute(text("""
-                    ALTER TABLE "Papers" 
-                    ALTER COLUMN id SET NOT NULL
-                """))
-
-                conn.execute(text("""
-                    CREATE INDEX papers_id_idx ON "Papers" (id)
-                """))
+    if "--status" in sys.argv:
+        with engine.connect() as conn:
+            exists = conn.execute(text("SELECT to_regclass('schema_migrations')")).scalar()
+            applied = dict(conn.execute(text("SELECT version, applied_at FROM schema_migrations")).all()) if exists else {}
+        for migration in MIGRATIONS:
+            state = f"applied {applied[migration.version]:%Y-%m-%d %H:%M}" if migration.version in applied else "pending"
+            logger.info(f"{migration.version:>3} {migration.description:<60} {state}")
+        return
 
-                conn.execute(text("""
-                    CREATE INDEX papers_id_citations_idx ON "Papers" (id, citations)
-                """))
-                
-                logger.info("Migration completed successfully")
-            else:
-                logger.info("ID column already exists, no migration needed")
-            
-            transaction.commit()
-            logger.info(" migration committed ")
-            
-        except Exception as e:
-            transaction.rollback()
-            logger.error(f"Migration failed: {str(e)}")
-            raise
+    try:
+        applied = migrate(engine, allow_deletes=True) # startup defers migrations that delete rows to here
+        logger.info(f" migrations committed: {applied or 'none pending'}")
+    except Exception as e:
+        logger.error(f"Migration failed: {str(e)}")
+        raise
 
 if __name__ == "__main__":
-    migrate_database()
\ No newline at end of file
+    migrate_database()
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState } from "react"
 import { PaperCard } from "@/components/paper-card"
 import { PaginationControls } from "@/components/pagination-controls"
 import { CategorySearch } from "@/components/category-search"
@@ -10,7 +10,7 @@ import { Button } from "@/components/ui/button"
 import { ArrowDownUp, AlertCircle } from "lucide-react"
 import { generatePaperContextId } from "@/lib/utils" 
 import { fetchHighlyCitedPapers } from "@/lib/api"
-import { Paper } from "@/hooks/use-saved-papers"
+import { usePaperFeed } from "@/hooks/use-paper-feed"
 import { Alert, AlertTitle, AlertDescription } from "@/components/ui/alert"
 import { Skeleton } from "@/components/ui/skeleton"
 import {
@@ -28,9 +28,7 @@ export default function HighlyCited() {
   const [currentPage, setCurrentPage] = useState(1)
   const [selectedCategories, setSelectedCategories] = useState<CategoryType[]>([])
   const [sortBy, setSortBy] = useState<SortOption>("citations")
-  const [papers, setPapers] = useState<Paper[]>([])
-  const [isLoading, setIsLoading] = useState(true)
-  const [error, setError] = useState<string | null>(null)
+  const { papers, isLoading, isLoadingMore, error, hasMore, loadMore } = usePaperFeed(fetchHighlyCitedPapers)
   const { scrollYProgress } = useScroll()
   const scaleX = useSpring(scrollYProgress, {
     stiffness: 100,
@@ -38,25 +36,6 @@ export default function HighlyCited() {
     restDelta: 0.001
   })
 
-  useEffect(() => {
-    async function loadPapers() {
-      setIsLoading(true)
-      setError(null)
-      
-      try {
-        const data = await fetchHighlyCitedPapers()
-        setPapers(data)
-      } catch (err) {
-        console.error("Failed to fetch highly cited papers:", err)
-        setError("Failed to load papers. Please try again later.")
-      } finally {
-        setIsLoading(false)
-      }
-    }
-    
-    loadPapers()
-  }, [])
-
   const handleSelectCategory = (category: CategoryType) => {
     setSelectedCategories(prev => 
       prev.includes(category)
@@ -257,6 +236,14 @@ export default function HighlyCited() {
             </motion.div>
           )
         )}
+
+        {!isLoading && hasMore && (
+          <div className="flex justify-center mt-6">
+            <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+              {isLoadingMore ? "Loading..." : "Load more papers"}
+            </Button>
+          </div>
+        )}
       </div>
     </>
   )
@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useRef, useEffect } from "react"
+import { useState, useRef } from "react"
 import { PaperCard } from "@/components/paper-card"
 import { PaginationControls } from "@/components/pagination-controls"
 import { CategorySearch } from "@/components/category-search"
@@ -8,9 +8,10 @@ import { ExternalSearch } from "@/components/external-search"
 import { type CategoryType } from "@/lib/categories"
 import { motion, useScroll, useSpring, AnimatePresence } from "framer-motion"
 import { Separator } from "@/components/ui/separator"
+import { Button } from "@/components/ui/button"
 import { generatePaperContextId } from "@/lib/utils"
 import { fetchRecentPapers } from "@/lib/api"
-import { Paper } from "@/hooks/use-saved-papers"
+import { usePaperFeed } from "@/hooks/use-paper-feed"
 import { AlertCircle } from "lucide-react"
 import { Alert, AlertTitle, AlertDescription } from "@/components/ui/alert"
 import { Skeleton } from "@/components/ui/skeleton"
@@ -20,9 +21,7 @@ const ITEMS_PER_PAGE = 9
 export default function Home() {
   const [currentPage, setCurrentPage] = useState(1)
   const [selectedCategories, setSelectedCategories] = useState<CategoryType[]>([])
-  const [papers, setPapers] = useState<Paper[]>([])
-  const [isLoading, setIsLoading] = useState(true)
-  const [error, setError] = useState<string | null>(null)
+  const { papers, isLoading, isLoadingMore, error, hasMore, loadMore } = usePaperFeed(fetchRecentPapers)
   const containerRef = useRef<HTMLDivElement>(null)
   const { scrollYProgress } = useScroll()
   const scaleX = useSpring(scrollYProgress, {
@@ -31,25 +30,6 @@ export default function Home() {
     restDelta: 0.001
   })
 
-  useEffect(() => {
-    async function loadPapers() {
-      setIsLoading(true)
-      setError(null)
-      
-      try {
-        const data = await fetchRecentPapers()
-        setPapers(data)
-      } catch (err) {
-        console.error("Failed to fetch papers:", err)
-        setError("Failed to load papers. Please try again later.")
-      } finally {
-        setIsLoading(false)
-      }
-    }
-    
-    loadPapers()
-  }, [])
-
   const filteredPapers = papers.filter(paper => 
     selectedCategories.length === 0 || 
     selectedCategories.every(category => 
@@ -212,6 +192,14 @@ export default function Home() {
             />
           </motion.div>
         )}
+
+        {!isLoading && hasMore && (
+          <div className="flex justify-center mt-6">
+            <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+              {isLoadingMore ? "Loading..." : "Load more papers"}
+            </Button>
+          </div>
+        )}
       </div>
     </>
   )
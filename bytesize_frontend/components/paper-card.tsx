@@ -7,6 +7,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from
 import { cn } from "@/lib/utils"
 import { useSavedPapers, type Paper } from "@/hooks/use-saved-papers"
 import { CATEGORIES } from "@/lib/categories"
+import { fetchPaperDetails } from "@/lib/api"
 import { motion, AnimatePresence } from "framer-motion"
 import { Tooltip, TooltipContent, TooltipProvider, TooltipTrigger } from "@/components/ui/tooltip"
 import { Separator } from "@/components/ui/separator"
@@ -22,6 +23,22 @@ export function PaperCard({ paper, showCitations = false, onUnsave }: PaperCardP
   const isSaved = isPaperSaved(paper.id)
   const [isHovered, setIsHovered] = React.useState(false)
   const [isDialogOpen, setIsDialogOpen] = React.useState(false)
+  const [laymanSummary, setLaymanSummary] = React.useState(paper.laymanSummary)
+  const [abstract, setAbstract] = React.useState(paper.abstract)
+  const [detailsLoaded, setDetailsLoaded] = React.useState(false)
+
+  // feeds only carry a preview of the summary, pull in the full text + layman summary when the dialog opens
+  React.useEffect(() => {
+    if (!isDialogOpen || detailsLoaded) return
+    let cancelled = false
+    fetchPaperDetails(paper).then((details) => {
+      if (cancelled) return
+      setDetailsLoaded(true)
+      if (details?.abstract) setAbstract(details.abstract)
+      if (details?.laymanSummary) setLaymanSummary(details.laymanSummary)
+    })
+    return () => { cancelled = true }
+  }, [isDialogOpen, detailsLoaded, paper])
 
   const handleSaveToggle = (e: React.MouseEvent) => {
     e.stopPropagation()
@@ -160,13 +177,13 @@ export function PaperCard({ paper, showCitations = false, onUnsave }: PaperCardP
                 animate={{ opacity: 1, y: 0 }}
                 transition={{ delay: 0.2 }}
               >
-                {paper.laymanSummary && (
+                {laymanSummary && (
                   <div className="bg-muted/50 p-4 rounded-lg border">
                     <h4 className="font-semibold mb-2 text-lg flex items-center">
                       ByteSize Summary
                     </h4>
                     <div className="text-sm leading-loose space-y-4">
-                      {paper.laymanSummary.split('\n\n').map((paragraph, index) => (
+                      {laymanSummary.split('\n\n').map((paragraph, index) => (
                         <p key={index}>{paragraph}</p>
                       ))}
                     </div>
@@ -182,7 +199,7 @@ export function PaperCard({ paper, showCitations = false, onUnsave }: PaperCardP
 
                 <div>
                   <h4 className="font-semibold mb-2 text-lg">Abstract</h4>
-                  <p className="text-sm leading-relaxed">{paper.abstract}</p>
+                  <p className="text-sm leading-relaxed">{abstract}</p>
                 </div>
 
                 {showCitations && paper.citations && (
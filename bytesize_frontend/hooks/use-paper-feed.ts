@@ -0,0 +1,54 @@
+"use client"
+
+import { useCallback, useEffect, useState } from "react"
+import { type Paper } from "@/hooks/use-saved-papers"
+import { type PaperFeedPage } from "@/lib/api"
+
+// Loads the first feed page on mount, later pages only when loadMore is called
+export function usePaperFeed(fetchPage: (cursor: string | null) => Promise<PaperFeedPage>) {
+  const [papers, setPapers] = useState<Paper[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [isLoading, setIsLoading] = useState(true)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
+  const [error, setError] = useState<string | null>(null)
+
+  useEffect(() => {
+    async function loadFirstPage() {
+      setIsLoading(true)
+      setError(null)
+
+      try {
+        const page = await fetchPage(null)
+        setPapers(page.papers)
+        setNextCursor(page.nextCursor)
+      } catch (err) {
+        console.error("Failed to fetch papers:", err)
+        setError("Failed to load papers. Please try again later.")
+      } finally {
+        setIsLoading(false)
+      }
+    }
+
+    loadFirstPage()
+  }, [fetchPage])
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || isLoadingMore) {
+      return
+    }
+    setIsLoadingMore(true)
+
+    try {
+      const page = await fetchPage(nextCursor)
+      setPapers(prev => [...prev, ...page.papers])
+      setNextCursor(page.nextCursor)
+    } catch (err) {
+      console.error("Failed to fetch more papers:", err)
+      setError("Failed to load more papers. Please try again later.")
+    } finally {
+      setIsLoadingMore(false)
+    }
+  }, [fetchPage, nextCursor, isLoadingMore])
+
+  return { papers, isLoading, isLoadingMore, error, hasMore: nextCursor !== null, loadMore }
+}
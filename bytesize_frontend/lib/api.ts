@@ -9,8 +9,9 @@ export interface ApiPaper {
   title: string;
   authors: string[];
   published: string;
-  summary: string;
-  layman_summary: string | null;
+  summary?: string;
+  preview?: string;
+  layman_summary?: string | null;
   link: string;
   categories: string[];
   citations: number;
@@ -26,7 +27,7 @@ export function convertApiPaperToPaper(apiPaper: ApiPaper): Paper {
     title: apiPaper.title,
     authors: apiPaper.authors || [],
     categories: mappedCategories,
-    abstract: apiPaper.summary || "",
+    abstract: apiPaper.summary || apiPaper.preview || "",
     publishedDate: apiPaper.published || new Date().toISOString(),
     laymanSummary: apiPaper.layman_summary || undefined,
     pdfUrl: apiPaper.link || "",
@@ -34,41 +35,79 @@ export function convertApiPaperToPaper(apiPaper: ApiPaper): Paper {
   };
 }
 
-// Fetch recent papers
-export async function fetchRecentPapers(): Promise<Paper[]> {
+export interface ApiPaperPage {
+  papers: ApiPaper[];
+  next_cursor: string | null;
+}
+
+// Feed cards only show the start of the summary, the full text + layman summary are fetched on demand by fetchPaperDetails
+const FEED_FIELDS = "id,title,authors,published,preview,link,categories,citations";
+// arXiv results are not stored => nothing to fetch later, search asks for the full summary up front
+const SEARCH_FIELDS = "id,title,authors,published,summary,link,categories,citations";
+
+export interface PaperFeedPage {
+  papers: Paper[];
+  nextCursor: string | null;
+}
+
+// One page of the cursor-paginated feed endpoint, pass nextCursor back in for the following page
+async function fetchPaperFeed(cite: boolean, cursor: string | null): Promise<PaperFeedPage> {
+  const url = `${API_BASE_URL}/papers/${cite}?fields=${FEED_FIELDS}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : "");
+  const response = await fetch(url);
+
+  if (!response.ok) {
+    throw new Error(`API error: ${response.status}`);
+  }
+
+  const page: ApiPaperPage = await response.json();
+  return { papers: page.papers.map(convertApiPaperToPaper), nextCursor: page.next_cursor };
+}
+
+// Fetch a page of recent papers
+export async function fetchRecentPapers(cursor: string | null = null): Promise<PaperFeedPage> {
   try {
     console.log("Fetching recent papers from:", `${API_BASE_URL}/papers/false`);
-    const response = await fetch(`${API_BASE_URL}/papers/false`);
-    
-    if (!response.ok) {
-      throw new Error(`API error: ${response.status}`);
-    }
-    
-    const data: ApiPaper[] = await response.json();
-    console.log("Recent papers data:", data);
-    return data.map(convertApiPaperToPaper);
+    return await fetchPaperFeed(false, cursor);
   } catch (error) {
     console.error('Error fetching recent papers:', error);
-    return [];
+    return { papers: [], nextCursor: null };
   }
 }
 
-// Fetch highly cited papers
-export async function fetchHighlyCitedPapers(): Promise<Paper[]> {
+// Fetch a page of highly cited papers
+export async function fetchHighlyCitedPapers(cursor: string | null = null): Promise<PaperFeedPage> {
   try {
     console.log("Fetching highly cited papers from:", `${API_BASE_URL}/papers/true`);
-    const response = await fetch(`${API_BASE_URL}/papers/true`);
-    
+    return await fetchPaperFeed(true, cursor);
+  } catch (error) {
+    console.error('Error fetching highly cited papers:', error);
+    return { papers: [], nextCursor: null };
+  }
+}
+
+export interface PaperDetails {
+  abstract?: string;
+  laymanSummary?: string;
+}
+
+// Fetch the full summary + layman summary of a stored paper
+export async function fetchPaperDetails(paper: Paper): Promise<PaperDetails | undefined> {
+  if (!/^\d+$/.test(paper.id)) {
+    return undefined; // arXiv search results are not stored
+  }
+
+  try {
+    const response = await fetch(`${API_BASE_URL}/paper/${paper.id}`);
+
     if (!response.ok) {
       throw new Error(`API error: ${response.status}`);
     }
-    
-    const data: ApiPaper[] = await response.json();
-    console.log("Highly cited papers data:", data);
-    return data.map(convertApiPaperToPaper);
+
+    const data: ApiPaper = await response.json();
+    return { abstract: data.summary || undefined, laymanSummary: data.layman_summary || undefined };
   } catch (error) {
-    console.error('Error fetching highly cited papers:', error);
-    return [];
+    console.error('Error fetching paper details:', error);
+    return undefined;
   }
 }
 
@@ -80,7 +119,7 @@ export async function searchPapers(option: string, query: string): Promise<Paper
     const safeQuery = encodeURIComponent(query);
     
     // Add a max_results parameter to get more results when available
-    const url = `${API_BASE_URL}/search/${safeOption}/${safeQuery}?max_results=20`;
+    const url = `${API_BASE_URL}/search/${safeOption}/${safeQuery}?max_results=20&fields=${SEARCH_FIELDS}`;
     console.log("Searching with URL:", url);
     
     const response = await fetch(url);